@@ -0,0 +1,143 @@
+import sys
+import os
+import base64
+import io
+import pandas as pd
+import pytest
+
+# caution: path[0] is reserved for script path (or '' in REPL)
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PARENT_DIR = os.path.dirname(THIS_DIR)
+
+# the cache is module state, so everything is imported through the mecsimcalc package
+sys.path.insert(1, PARENT_DIR)
+
+from mecsimcalc.file_utils.cache_utils import (
+    DecodeCache,
+    enable_decode_cache,
+    disable_decode_cache,
+    decode_cache_info,
+)
+from mecsimcalc.file_utils.general_utils import input_to_file
+from mecsimcalc.file_utils.spreadsheet_utils import input_to_dataframe
+from mecsimcalc.file_utils.image_utils import input_to_PIL
+
+
+@pytest.fixture(autouse=True)
+def no_cache():
+    disable_decode_cache()
+    yield
+    disable_decode_cache()
+
+
+def test_cache_disabled():
+    assert decode_cache_info() is None
+    assert input_to_file(get_csv()).read() == read_file("csvFile.csv")
+
+
+def test_input_to_file_cache():
+    enable_decode_cache()
+    first = input_to_file(get_csv()).read()
+    second = input_to_file(get_csv()).read()
+
+    assert first == second == read_file("csvFile.csv")
+    info = decode_cache_info()
+    assert (info["hits"], info["misses"]) == (1, 1)
+
+
+def test_input_to_dataframe_cache():
+    enable_decode_cache()
+    df, file_extension = input_to_dataframe(get_csv(), get_file_extension=True)
+    df["new column"] = 1  # changes to the returned dataframe must not leak into the cache
+
+    cached_df, cached_extension = input_to_dataframe(get_csv(), get_file_extension=True)
+    assert cached_extension == file_extension == ".csv"
+    assert "new column" not in cached_df.columns
+    assert cached_df.equals(pd.read_csv(io.BytesIO(read_file("csvFile.csv"))))
+
+    # one miss and one hit: the file lookup behind a parsed object miss isn't counted separately
+    info = decode_cache_info()
+    assert (info["hits"], info["misses"]) == (1, 1)
+
+
+def test_input_to_dataframe_hashes_once(monkeypatch):
+    import mecsimcalc.file_utils.general_utils as general_utils
+    import mecsimcalc.file_utils.spreadsheet_utils as spreadsheet_utils
+
+    digests = []
+    payload_digest = general_utils.payload_digest
+
+    def counting_digest(input_file):
+        digests.append(len(input_file))
+        return payload_digest(input_file)
+
+    monkeypatch.setattr(general_utils, "payload_digest", counting_digest)
+    monkeypatch.setattr(spreadsheet_utils, "payload_digest", counting_digest)
+
+    enable_decode_cache()
+    input_to_dataframe(get_csv())
+    assert len(digests) == 1
+
+
+def test_input_to_PIL_cache():
+    enable_decode_cache()
+    image = input_to_PIL(get_jpg())
+    cached_image, file_extension = input_to_PIL(get_jpg(), get_file_extension=True)
+
+    assert file_extension == ".jpg"
+    assert cached_image is not image
+    assert cached_image.format == "JPEG"
+    assert cached_image.tobytes() == image.tobytes()
+    info = decode_cache_info()
+    assert (info["hits"], info["misses"]) == (1, 1)
+
+
+def test_lru_eviction():
+    cache = DecodeCache(max_bytes=10)
+    cache.put("a", b"aaaa", 4)
+    cache.put("b", b"bbbb", 4)
+    cache.get("a")  # "b" is now the least recently used entry
+    cache.put("c", b"cccc", 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.info()["size"] == 8
+
+    # entries larger than the whole cache are not stored
+    cache.put("d", b"d" * 20, 20)
+    assert cache.get("d") is None
+
+
+def test_disk_cache(tmp_path):
+    enable_decode_cache(directory=str(tmp_path))
+    input_to_file(get_csv())
+    assert len(os.listdir(tmp_path)) == 1
+
+    # a new cache (e.g., in a new process) reads the file from disk
+    enable_decode_cache(directory=str(tmp_path))
+    assert input_to_file(get_csv()).read() == read_file("csvFile.csv")
+    assert decode_cache_info()["disk_hits"] == 1
+
+
+def test_disk_cache_unwritable(tmp_path):
+    directory = tmp_path / "cache"
+    enable_decode_cache(directory=str(directory))
+    directory.rmdir()
+
+    # the data is still decoded and kept in memory
+    assert input_to_file(get_csv()).read() == read_file("csvFile.csv")
+    assert input_to_file(get_csv()).read() == read_file("csvFile.csv")
+    assert decode_cache_info()["hits"] == 1
+
+
+def read_file(name):
+    with open(os.path.join(THIS_DIR, "test_files", name), "rb") as file:
+        return file.read()
+
+
+def get_csv():
+    return "data:text/csv;base64," + base64.b64encode(read_file("csvFile.csv")).decode()
+
+
+def get_jpg():
+    return "data:image/jpeg;base64," + base64.b64encode(read_file("coconut.jpg")).decode()
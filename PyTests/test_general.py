@@ -4,13 +4,15 @@ import base64
 import mimetypes
 from PIL import Image
 import io
+import pytest
 
 # caution: path[0] is reserved for script path (or '' in REPL)
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 PARENT_DIR = os.path.dirname(THIS_DIR)
 
 sys.path.insert(1, f"{PARENT_DIR}/mecsimcalc/file_utils")
-from general_utils import input_to_file
+import general_utils
+from general_utils import input_to_file, inputs_to_files, Base64Reader
 
 def test_input_to_file():
   img = readImg()
@@ -38,6 +40,118 @@ def test_input_to_file():
   assert isinstance(fileMP4, io.BytesIO)
 
 
+def test_input_to_file_chunked(monkeypatch):
+  data = os.urandom(1000)
+  encoded = base64.b64encode(data).decode()
+  monkeypatch.setattr(general_utils, "DECODE_CHUNK_SIZE", 64)
+
+  file = input_to_file(f"data:application/octet-stream;base64,{encoded}")
+  assert file.read() == data
+
+  # line breaks misalign the chunks, so the whole payload is decoded at once instead
+  wrapped = "\n".join(encoded[i : i + 76] for i in range(0, len(encoded), 76))
+  file = input_to_file(f"data:application/octet-stream;base64,{wrapped}")
+  assert file.read() == data
+
+
+def test_base64_reader():
+  data = os.urandom(1000)
+  input_file = f"data:application/octet-stream;base64,{base64.b64encode(data).decode()}"
+
+  reader = Base64Reader(input_file)
+  assert reader.size == len(data)
+  assert reader.read(10) == data[:10]
+  assert reader.tell() == 10
+
+  reader.seek(500)
+  assert reader.read(7) == data[500:507]
+  reader.seek(-3, io.SEEK_END)
+  assert reader.read() == data[-3:]
+  assert reader.read() == b""
+
+  reader.seek(0)
+  assert reader.read() == data
+
+  # lazy input_to_file returns a Base64Reader
+  file, file_extension = input_to_file(readCSV(), get_file_extension=True, lazy=True)
+  assert isinstance(file, Base64Reader)
+  assert file_extension == ".csv"
+  assert file.read() == input_to_file(readCSV()).read()
+
+
+def test_base64_reader_whitespace():
+  with pytest.raises(ValueError):
+    Base64Reader("data:text/plain;base64,aGVs\nbG8=")
+
+  # whitespace that keeps the length a multiple of 4 is rejected too, instead of reading the wrong bytes
+  encoded = base64.b64encode(bytes(range(36))).decode()
+  for separator in ("\r\n", " \t"):
+    wrapped = separator.join(encoded[i : i + 16] for i in range(0, len(encoded), 16))
+    assert len(wrapped) % 4 == 0
+    with pytest.raises(ValueError):
+      Base64Reader(f"data:application/octet-stream;base64,{wrapped}")
+  with pytest.raises(ValueError):
+    Base64Reader(f"data:application/octet-stream;base64,{encoded}\r\n\r\n")
+
+
+def test_input_to_file_extension():
+  encoded = base64.b64encode(b"A,B\n1,2").decode()
+
+  _, extension = input_to_file(f"data:text/csv;charset=utf-8;base64,{encoded}", get_file_extension=True)
+  assert extension == ".csv"
+  _, extension = input_to_file(f"data:IMAGE/JPEG;base64,{encoded}", get_file_extension=True)
+  assert extension == ".jpg"
+  _, extension = input_to_file(f"data:application/x-mecsimcalc-unknown;base64,{encoded}", get_file_extension=True)
+  assert extension is None
+
+  # metadata longer than MAX_METADATA_LENGTH
+  name = "x" * general_utils.MAX_METADATA_LENGTH
+  file, extension = input_to_file(f"data:text/csv;name={name};base64,{encoded}", get_file_extension=True)
+  assert (file.read(), extension) == (b"A,B\n1,2", ".csv")
+
+
+def test_inputs_to_files():
+  inputs = {"img": readImg(), "csv": readCSV(), "html": readHTML()}
+
+  # serial and thread pool decoding return the same results in the same shape
+  for serial_threshold in (float("inf"), 0):
+    files = inputs_to_files(inputs, get_file_extension=True, max_workers=2, serial_threshold=serial_threshold)
+    assert list(files) == ["img", "csv", "html"]
+    assert [extension for _, extension in files.values()] == [".jpg", ".csv", ".html"]
+    assert files["csv"][0].read() == input_to_file(readCSV()).read()
+
+    files = inputs_to_files(list(inputs.values()), max_workers=2, serial_threshold=serial_threshold)
+    assert isinstance(files, list)
+    assert all(isinstance(file, io.BytesIO) for file in files)
+
+
+def test_inputs_to_files_default_serial(monkeypatch):
+  pools = []
+
+  class RecordingPool(general_utils.ThreadPoolExecutor):
+    def __init__(self, *args, **kwargs):
+      pools.append(args)
+      super().__init__(*args, **kwargs)
+
+  monkeypatch.setattr(general_utils, "ThreadPoolExecutor", RecordingPool)
+  monkeypatch.setattr(general_utils, "PARALLEL_DECODE_THRESHOLD", 0)
+  inputs = [readCSV(), readHTML()]
+
+  # decoding holds the GIL, so threads are only used by default on free-threaded builds
+  monkeypatch.setattr(general_utils, "_gil_enabled", lambda: True)
+  inputs_to_files(inputs, max_workers=2)
+  assert pools == []
+
+  monkeypatch.setattr(general_utils, "_gil_enabled", lambda: False)
+  inputs_to_files(inputs, max_workers=2)
+  assert len(pools) == 1
+
+
+def test_input_to_file_invalid():
+  with pytest.raises(ValueError):
+    input_to_file("data:text/plain,hello")
+
+
 # returns part of the image metadata
 def get_mime_type(file_path):
   return mimetypes.guess_type(file_path)[0]
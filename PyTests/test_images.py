@@ -4,6 +4,8 @@ import base64
 import mimetypes
 from PIL import Image
 import io
+import gc
+import pytest
 
 # caution: path[0] is reserved for script path (or '' in REPL)
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,7 +14,8 @@ PARENT_DIR = os.path.dirname(THIS_DIR)
 sys.path.insert(1, f"{PARENT_DIR}/mecsimcalc/file_utils")
 
 from general_utils import input_to_file
-from image_utils import input_to_PIL, file_to_PIL, print_image
+from image_utils import input_to_PIL, file_to_PIL, print_image, print_images, available_image_formats
+import image_utils
 
 # tests decode_file_data
 
@@ -47,6 +50,24 @@ def test_input_to_PIL():
     assert isinstance(pillow2, Image.Image)
 
 
+def test_input_to_PIL_decodes_once(monkeypatch):
+    import mecsimcalc.file_utils.general_utils as package_general_utils
+
+    decode_calls = []
+    decode = package_general_utils._decode_base64
+
+    def counting_decode(*args, **kwargs):
+        decode_calls.append(args)
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(package_general_utils, "_decode_base64", counting_decode)
+
+    image, file_extension = input_to_PIL(get_input(), get_file_extension=True)
+    assert file_extension == ".jpg"
+    assert isinstance(image, Image.Image)
+    assert len(decode_calls) == 1
+
+
 def test_file_to_PIL():
     # convert file data to pillow image
     input_data = get_input()
@@ -76,6 +97,195 @@ def test_print_image():
     assert downloadHTML.endswith(">")
 
 
+def test_input_to_PIL_size():
+    for format in ("JPEG", "PNG"):
+        buffer = io.BytesIO()
+        Image.new("RGB", (1600, 1200), "orange").save(buffer, format=format)
+        input_data = f"data:{Image.MIME[format]};base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+        # decoded at a fraction of the full size, but never smaller than requested
+        image = input_to_PIL(input_data, size=(200, 200))
+        image.load()
+        assert image.format == format
+        assert 200 <= image.width < 1600 and 200 <= image.height < 1200
+        assert abs(image.width / image.height - 4 / 3) < 0.01
+
+        # already smaller than the hint
+        assert input_to_PIL(input_data, size=(2000, 2000)).size == (1600, 1200)
+
+        assert print_image(image).startswith("<img src=")
+
+    # modes Image.reduce can't shrink (palette GIFs and PNGs, 1-bit and 16-bit PNGs) are decoded in full
+    for mode, format in (("P", "GIF"), ("P", "PNG"), ("1", "PNG"), ("I;16", "PNG")):
+        input_data = encode_image(Image.new(mode, (1000, 800)), format)
+        image = input_to_PIL(input_data, size=(200, 200))
+        assert (image.mode, image.format, image.size) == (mode, format, (1000, 800))
+        assert print_image(image).startswith("<img src=")
+
+
+def test_print_image_download_original():
+    input_data = get_input()
+    image = input_to_PIL(input_data)
+
+    # the uploaded file is linked as is
+    displayHTML, downloadHTML = print_image(image, download=True, download_original=True, download_file_name="photo")
+    assert displayHTML.startswith("<img src='data:image/jpeg;base64,")
+    assert downloadHTML == f"<a href='{input_data}' download='photo.jpg'>Download Image</a>"
+
+    # images that don't come from input_to_PIL are encoded
+    image = Image.new("RGB", (300, 300), "orange")
+    image.format = "PNG"
+    _, downloadHTML = print_image(image, download=True, download_original=True)
+    assert downloadHTML.startswith("<a href='data:image/png;base64,")
+    assert downloadHTML.endswith("download='myimg.png'>Download Image</a>")
+
+
+def test_print_image_keeps_image():
+    for image in (input_to_PIL(get_input()), Image.new("RGB", (800, 600), "orange")):
+        image.format = image.format or "PNG"
+        size = image.size
+
+        for resample, reducing_gap in ((Image.NEAREST, None), (Image.BILINEAR, 1.5), (Image.BICUBIC, 2.0)):
+            displayHTML = print_image(image, width=100, height=100, resample=resample, reducing_gap=reducing_gap)
+            assert displayHTML.startswith("<img src=")
+
+            preview = Image.open(io.BytesIO(base64.b64decode(displayHTML.split(",", 1)[1][:-2])))
+            assert max(preview.size) == 100
+
+        # the caller's image isn't resized
+        assert image.size == size
+
+
+def test_print_image_cache_preview(monkeypatch):
+    thumbnail_calls = []
+    thumbnail = image_utils._thumbnail
+
+    def counting_thumbnail(*args, **kwargs):
+        thumbnail_calls.append(args[1])
+        return thumbnail(*args, **kwargs)
+
+    monkeypatch.setattr(image_utils, "_thumbnail", counting_thumbnail)
+
+    image = Image.new("RGB", (800, 600), "orange")
+    image.format = "PNG"
+    first = print_image(image, cache_preview=True)
+    assert print_image(image, cache_preview=True) is first
+    assert len(thumbnail_calls) == 1
+
+    # other options are a different preview, without cache_preview nothing is reused
+    print_image(image, width=100, height=100, cache_preview=True)
+    print_image(image)
+    assert len(thumbnail_calls) == 3
+
+    # freed together with the image
+    image_id = id(image)
+    del image
+    gc.collect()
+    assert image_id not in image_utils._preview_cache
+
+
+def decode_image_tag(displayHTML):
+    metadata, data = displayHTML[len("<img src='"):-len("'>")].split(",", 1)
+    return metadata, Image.open(io.BytesIO(base64.b64decode(data)))
+
+
+@pytest.mark.parametrize("output_format", available_image_formats())
+def test_print_image_output_format(output_format):
+    # RGBA, so JPEG has to convert it
+    image = Image.new("RGBA", (400, 300), (255, 128, 0, 128))
+    image.format = "PNG"
+
+    metadata, preview = decode_image_tag(print_image(image, output_format=output_format.lower(), quality=60))
+    assert metadata == f"data:{Image.MIME[output_format]};base64"
+    assert preview.format == output_format
+    assert preview.size == (200, 150)
+
+
+def test_print_image_output_format_auto():
+    image = input_to_PIL(get_input())
+
+    # every format is tried, the smallest is kept
+    sizes = {
+        file_format: len(print_image(image, output_format=file_format, quality=50))
+        for file_format in available_image_formats()
+    }
+    displayHTML = print_image(image, output_format="auto", quality=50)
+    assert len(displayHTML) == min(sizes.values())
+
+    with pytest.raises(ValueError):
+        print_image(image, output_format="bmp")
+
+
+def test_print_image_output_format_auto_transparency(monkeypatch):
+    # without WebP and AVIF, JPEG is the smallest encoding of a noisy image
+    monkeypatch.setattr(image_utils, "available_image_formats", lambda: ("JPEG", "PNG"))
+    noise = Image.effect_noise((200, 150), 64).convert("RGB")
+    assert decode_image_tag(print_image(noise, output_format="auto"))[1].format == "JPEG"
+
+    # transparency is kept
+    image = noise.convert("RGBA")
+    image.putalpha(128)
+    metadata, preview = decode_image_tag(print_image(image, output_format="auto"))
+    assert (metadata, preview.mode) == ("data:image/png;base64", "RGBA")
+    assert preview.getpixel((0, 0))[3] == 128
+
+    palette = noise.convert("P")
+    palette.info["transparency"] = 0
+    assert decode_image_tag(print_image(palette, output_format="auto"))[1].format == "PNG"
+
+
+@pytest.mark.parametrize("output_format", ["PNG", "auto", None])
+def test_print_image_without_format(output_format):
+    # images made in code have no format
+    image = Image.new("RGB", (400, 300), (255, 128, 0))
+    assert image.format is None
+
+    displayHTML, download_link = print_image(image, download=True, output_format=output_format)
+    metadata, preview = decode_image_tag(displayHTML)
+    assert preview.size == (200, 150)
+    if output_format == "PNG":
+        assert (metadata, preview.format) == ("data:image/png;base64", "PNG")
+
+    # the download falls back to PNG
+    assert download_link.startswith("<a href='data:image/png;base64,")
+    assert "download='myimg.png'" in download_link
+
+
+def test_print_images():
+    # palette GIFs and PNGs can't be shrunk by the size hint print_images decodes with
+    palette = Image.new("RGB", (600, 450), "teal").convert("P")
+    inputs = {
+        "coconut": get_input(),
+        "orange": encode_image(Image.new("RGB", (400, 300), "orange"), "PNG"),
+        "gif": encode_image(palette, "GIF"),
+        "palette": encode_image(palette, "PNG"),
+    }
+
+    expected = [print_image(input_to_PIL(value), width=100, height=100) for value in inputs.values()]
+
+    # serial and process pool results are the same, in the same order and shape
+    for serial_threshold in (float("inf"), 0):
+        html_images = print_images(inputs, width=100, height=100, max_workers=2, serial_threshold=serial_threshold)
+        assert list(html_images) == ["coconut", "orange", "gif", "palette"]
+        assert list(html_images.values()) == expected
+
+        html_images = print_images(
+            list(inputs.values())[::-1], width=100, height=100, max_workers=2, serial_threshold=serial_threshold
+        )
+        assert html_images == expected[::-1]
+
+    # errors in worker processes are raised in the caller
+    with pytest.raises(ValueError):
+        print_images([get_input(), "data:image/png;base64,aGVsbG8="], max_workers=2, serial_threshold=0)
+
+
+# returns image saved in format, base64 encoded
+def encode_image(image, format):
+    buffer = io.BytesIO()
+    image.save(buffer, format=format)
+    return f"data:{Image.MIME[format]};base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+
 # returns a base64 encoded image
 def get_input():
     return getInputImg(os.path.join(THIS_DIR, "./test_files/coconut.jpg"))
@@ -0,0 +1,50 @@
+import sys
+import os
+import subprocess
+
+# caution: path[0] is reserved for script path (or '' in REPL)
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PARENT_DIR = os.path.dirname(THIS_DIR)
+
+
+def test_import_is_lazy():
+    # importing mecsimcalc should not import any of the heavy dependencies
+    loaded = run_python(
+        "import sys, mecsimcalc; "
+        "print([m for m in ('pandas', 'matplotlib', 'plotly', 'PIL', 'requests', 'jwt') if m in sys.modules])"
+    )
+    assert loaded == "[]"
+
+
+def test_attribute_access_imports_submodule():
+    loaded = run_python(
+        "import sys, mecsimcalc; mecsimcalc.input_to_file; "
+        "print('mecsimcalc.file_utils.general_utils' in sys.modules, 'pandas' in sys.modules)"
+    )
+    assert loaded == "True False"
+
+
+def test_star_import():
+    names = run_python(
+        "from mecsimcalc import *; print(callable(input_to_file), callable(print_plot), callable(send_gmail))"
+    )
+    assert names == "True True True"
+
+
+def test_plot_draw_access():
+    names = run_python(
+        "import mecsimcalc; print(callable(mecsimcalc.draw_arrow), mecsimcalc.plot_draw.__name__)"
+    )
+    assert names == "True mecsimcalc.plot_draw"
+
+
+def run_python(code):
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PARENT_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    return result.stdout.strip()
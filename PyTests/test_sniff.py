@@ -0,0 +1,65 @@
+import sys
+import os
+import io
+import base64
+import codecs
+
+# caution: path[0] is reserved for script path (or '' in REPL)
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PARENT_DIR = os.path.dirname(THIS_DIR)
+
+sys.path.insert(1, f"{PARENT_DIR}/mecsimcalc/file_utils")
+
+from sniff_utils import sniff_extension
+from general_utils import input_to_file
+
+
+def test_sniff_test_files():
+    assert sniff(read_file("coconut.jpg")) == ".jpg"
+    assert sniff(read_file("xlsxFile.xlsx")) == ".xlsx"
+    assert sniff(read_file("mp4File.mp4")) == ".mp4"
+    assert sniff(read_file("csvFile.csv")) == ".txt"
+    assert sniff(read_file("csvFile.csv"), default=".csv") == ".csv"
+
+
+def test_sniff_signatures():
+    assert sniff(b"\x89PNG\r\n\x1a\n" + bytes(20)) == ".png"
+    assert sniff(b"GIF89a" + bytes(20)) == ".gif"
+    assert sniff(b"%PDF-1.7\n") == ".pdf"
+    assert sniff(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + bytes(20)) == ".xls"
+    assert sniff(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == ".webp"
+    assert sniff(codecs.BOM_UTF16_LE + "a,b\n1,2".encode("utf-16-le")) == ".txt"
+
+    # text that happens to start with "BM" is not a bitmap
+    assert sniff(b"BMI,height,weight\n20,180,65\n", default=".csv") == ".csv"
+
+    # unknown binary data and empty files keep the default
+    assert sniff(b"\x00\x01\x02\x03", default=".bin") == ".bin"
+    assert sniff(b"", default=".html") == ".html"
+
+
+def test_sniff_keeps_position():
+    file = io.BytesIO(read_file("xlsxFile.xlsx"))
+    file.seek(10)
+    sniff_extension(file)
+    assert file.tell() == 10
+
+
+def test_input_to_file_sniff():
+    # an xlsx file uploaded with the wrong MIME type
+    xlsx = "data:text/csv;base64," + base64.b64encode(read_file("xlsxFile.xlsx")).decode()
+
+    _, extension = input_to_file(xlsx, get_file_extension=True)
+    assert extension == ".csv"
+    file, extension = input_to_file(xlsx, get_file_extension=True, sniff=True)
+    assert extension == ".xlsx"
+    assert file.tell() == 0
+
+
+def sniff(data, default=None):
+    return sniff_extension(io.BytesIO(data), default=default)
+
+
+def read_file(name):
+    with open(os.path.join(THIS_DIR, "test_files", name), "rb") as file:
+        return file.read()
@@ -1,9 +1,14 @@
+import gc
+import gzip
+import zipfile
 import sys
 import os
 import base64
 import mimetypes
 import io
+import numpy as np
 import pandas as pd
+import pytest
 
 # caution: path[0] is reserved for script path (or '' in REPL)
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,8 +17,20 @@ PARENT_DIR = os.path.dirname(THIS_DIR)
 # add parent directory to path so we can import mecsimcalc
 sys.path.insert(1, f"{PARENT_DIR}/mecsimcalc/file_utils")
 
+import spreadsheet_utils
 from general_utils import input_to_file
-from spreadsheet_utils import input_to_dataframe, file_to_dataframe, print_dataframe
+from spreadsheet_utils import (
+    input_to_dataframe,
+    file_to_dataframe,
+    print_dataframe,
+    compact_dataframe,
+    available_csv_engines,
+    available_download_formats,
+    xlsx_to_dataframe,
+    input_to_workbook,
+    iter_dataframe_chunks,
+    reduce_dataframe_chunks,
+)
 
 
 def test_input_to_file():
@@ -57,6 +74,32 @@ def test_file_to_dataframe():
     assert isinstance(dfXLSX, pd.DataFrame)
 
 
+def test_file_to_dataframe_file_type():
+    fileCSV = input_to_file(get_csv())
+    fileXLSX = input_to_file(get_xlsx())
+
+    # explicit file types go straight to the right parser
+    assert file_to_dataframe(fileCSV, file_type="csv").equals(file_to_dataframe(input_to_file(get_csv())))
+    assert isinstance(file_to_dataframe(fileXLSX, file_type=".XLSX"), pd.DataFrame)
+
+    # unknown file types fall back to trying csv, then excel
+    fileXLSX = input_to_file(get_xlsx())
+    assert isinstance(file_to_dataframe(fileXLSX, file_type=".bin"), pd.DataFrame)
+
+    # the wrong file type raises instead of guessing
+    with pytest.raises(pd.errors.ParserError):
+        file_to_dataframe(input_to_file(get_xlsx()), file_type="csv")
+
+
+def test_input_to_dataframe_sniff():
+    # an excel file uploaded with a csv MIME type
+    inputXLSX = "data:text/csv;base64," + get_xlsx().split(";base64,")[1]
+    df, file_extension = input_to_dataframe(inputXLSX, get_file_extension=True)
+
+    assert file_extension == ".xlsx"
+    assert df.equals(input_to_dataframe(get_xlsx()))
+
+
 def test_input_to_dataframe():
     # get input data
     inputCSV = get_csv()
@@ -71,6 +114,201 @@ def test_input_to_dataframe():
     assert isinstance(dfXLSX, pd.DataFrame)
 
 
+def test_input_to_dataframe_options():
+    df = pd.DataFrame(
+        {"A": [1, 2, 3, 4], "B": [0.5, 1.5, 2.5, 3.5], "C": ["x", "y", "x", "x"], "D": ["2024-01-01"] * 4}
+    )
+    inputCSV = "data:text/csv;base64," + base64.b64encode(df.to_csv(index=False).encode()).decode()
+
+    result = input_to_dataframe(inputCSV, dtype={"A": "float64"}, usecols=["A", "C", "D"], parse_dates=["D"])
+    assert list(result.columns) == ["A", "C", "D"]
+    assert result["A"].dtype == "float64"
+    assert pd.api.types.is_datetime64_any_dtype(result["D"])
+
+    result = input_to_dataframe(inputCSV, compact=True, dtype={"B": "float64"})
+    assert result["A"].dtype == "uint8"
+    assert result["B"].dtype == "float64"  # columns with an explicit dtype are left alone
+    assert result["C"].dtype == "category"
+
+
+def test_file_to_dataframe_engine(monkeypatch):
+    import spreadsheet_utils
+
+    df = pd.DataFrame({"A": range(1000), "B": [f"row {i}" for i in range(1000)]})
+    data = df.to_csv(index=False).encode()
+
+    assert "c" in available_csv_engines()
+    for engine in ("auto",) + available_csv_engines():
+        result = file_to_dataframe(io.BytesIO(data), file_type="csv", engine=engine)
+        assert result["A"].tolist() == df["A"].tolist()
+        assert result["B"].tolist() == df["B"].tolist()
+
+    # "auto" falls back to the c engine if pyarrow fails
+    read_csv = pd.read_csv
+    engines = []
+
+    def failing_pyarrow(*args, engine=None, **kwargs):
+        engines.append(engine)
+        if engine == "pyarrow":
+            raise ValueError("unsupported option")
+        return read_csv(*args, engine=engine, **kwargs)
+
+    monkeypatch.setattr(spreadsheet_utils, "PYARROW_MIN_SIZE", 0)
+    monkeypatch.setattr(spreadsheet_utils, "available_csv_engines", lambda: ("pyarrow", "c", "python"))
+    monkeypatch.setattr(pd, "read_csv", failing_pyarrow)
+
+    result = file_to_dataframe(io.BytesIO(data), file_type="csv", engine="auto")
+    assert engines == ["pyarrow", "c"]
+    assert result["A"].tolist() == df["A"].tolist()
+
+    with pytest.raises(ValueError):
+        file_to_dataframe(io.BytesIO(data), file_type="csv", engine="fast")
+
+
+def test_file_to_dataframe_default_engine():
+    # large enough that "auto" would use pyarrow, which parses dates into datetime.date objects
+    rows = 20_000
+    df = pd.DataFrame(
+        {
+            "date": [f"2024-01-{day % 28 + 1:02d}" for day in range(rows)],
+            "value": np.arange(rows) / 4,
+            "label": [f"row {i}" for i in range(rows)],
+        }
+    )
+    data = df.to_csv(index=False).encode()
+
+    # the default parses the same values and dtypes as the c engine, whatever the file size
+    default = file_to_dataframe(io.BytesIO(data), file_type="csv")
+    c_engine = file_to_dataframe(io.BytesIO(data), file_type="csv", engine="c")
+    assert default.dtypes.equals(c_engine.dtypes)
+    assert default.equals(c_engine)
+    assert default["date"].str.startswith("2024-01").all()
+
+    small = file_to_dataframe(io.BytesIO(df.head(10).to_csv(index=False).encode()), file_type="csv")
+    assert small.dtypes.equals(default.dtypes)
+
+    if "pyarrow" in available_csv_engines():
+        pyarrow_engine = file_to_dataframe(io.BytesIO(data), file_type="csv", engine="pyarrow")
+        assert pyarrow_engine["value"].equals(c_engine["value"])
+        assert pyarrow_engine["label"].tolist() == c_engine["label"].tolist()
+
+
+def test_compact_dataframe():
+    df = pd.DataFrame(
+        {
+            "small": [-1, 0, 100],
+            "large": [0, 1, 2**40],
+            "exact": [0.5, 1.25, float("nan")],
+            "inexact": [0.1, 0.2, 0.3],
+            "repeated": ["a", "a", "b"],
+            "unique": ["a", "b", "c"],
+        }
+    )
+    compacted = compact_dataframe(df, category_threshold=0.7)
+
+    assert compacted["small"].dtype == "int8"
+    assert compacted["large"].dtype == "uint64"
+    assert compacted["exact"].dtype == "float32"
+    assert compacted["inexact"].dtype == "float64"  # float32 would lose precision
+    assert compacted["repeated"].dtype == "category"
+    assert compacted["unique"].dtype != "category"
+    assert df["small"].dtype == "int64"  # the original is not modified
+    for column in df.columns:
+        assert compacted[column].astype(object).equals(df[column].astype(object))
+
+
+def test_xlsx_to_dataframe():
+    df = xlsx_to_dataframe(input_to_file(get_xlsx()))
+    assert df.equals(pd.read_excel(input_to_file(get_xlsx()), engine="openpyxl"))
+
+    df = xlsx_to_dataframe(input_to_file(get_xlsx()), sheet_name=0, nrows=2)
+    assert len(df) == 2
+
+    df = xlsx_to_dataframe(input_to_file(get_xlsx()), header=False)
+    assert list(df.columns) == [0, 1, 2]
+    assert df.iloc[0].tolist() == ["a", "b", "c"]
+
+    # uneven rows, missing headers and multiple sheets
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        pd.DataFrame({"x": [1, 2]}).to_excel(writer, sheet_name="First", index=False)
+        pd.DataFrame([["h", None, None], [1, 2.5, "z"]]).to_excel(writer, sheet_name="Second", index=False, header=False)
+
+    df = xlsx_to_dataframe(io.BytesIO(buffer.getvalue()), sheet_name="Second")
+    assert list(df.columns) == ["h", "Unnamed: 1", "Unnamed: 2"]
+    assert df.iloc[0].tolist() == [1, 2.5, "z"]
+
+    with pytest.raises(KeyError):
+        xlsx_to_dataframe(io.BytesIO(buffer.getvalue()), sheet_name="Missing")
+
+    # repeated headers are renamed like pd.read_excel does
+    buffer = io.BytesIO()
+    rows = [["x", "x", "y", "x", "x.1", 1, 1, None, "Unnamed: 7"], list(range(9))]
+    pd.DataFrame(rows).to_excel(buffer, index=False, header=False, engine="openpyxl")
+    df = xlsx_to_dataframe(io.BytesIO(buffer.getvalue()))
+    expected = pd.read_excel(io.BytesIO(buffer.getvalue()), engine="openpyxl")
+    assert list(df.columns) == list(expected.columns)
+    assert list(df.columns) == ["x", "x.2", "y", "x.3", "x.1", 1, "1.1", "Unnamed: 7.1", "Unnamed: 7"]
+    assert df.equals(expected)
+
+
+def test_input_to_workbook():
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        pd.DataFrame({"x": [1, 2]}).to_excel(writer, sheet_name="Inputs", index=False)
+        pd.DataFrame({"y": ["a", "b", "c"]}).to_excel(writer, sheet_name="Materials", index=False)
+    inputXLSX = (
+        "data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,"
+        + base64.b64encode(buffer.getvalue()).decode()
+    )
+
+    workbook = input_to_workbook(inputXLSX)
+    assert workbook.sheet_names == ["Inputs", "Materials"]
+    assert list(workbook) == ["Inputs", "Materials"]
+    assert "Materials" in workbook and len(workbook) == 2
+
+    # sheets are only parsed when they are accessed, and only once
+    assert workbook.parsed_sheet_names == []
+    materials = workbook["Materials"]
+    assert materials["y"].tolist() == ["a", "b", "c"]
+    assert workbook.parsed_sheet_names == ["Materials"]
+    assert workbook[1] is materials
+    assert workbook[0]["x"].tolist() == [1, 2]
+
+    with pytest.raises(KeyError):
+        workbook["Missing"]
+    with pytest.raises(ValueError):
+        input_to_workbook(get_csv())
+
+
+def test_iter_dataframe_chunks():
+    df = pd.DataFrame({"A": range(25), "B": [i * 0.5 for i in range(25)]})
+    inputCSV = "data:text/csv;base64," + base64.b64encode(df.to_csv(index=False).encode()).decode()
+
+    chunks = list(iter_dataframe_chunks(inputCSV, chunksize=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert pd.concat(chunks).equals(df)
+
+    # extra keyword arguments are passed to pd.read_csv
+    chunks = list(iter_dataframe_chunks(inputCSV, chunksize=10, usecols=["B"]))
+    assert list(chunks[0].columns) == ["B"]
+
+    with pytest.raises(ValueError):
+        next(iter_dataframe_chunks(get_xlsx()))
+
+
+def test_reduce_dataframe_chunks():
+    df = pd.DataFrame({"A": range(25)})
+    inputCSV = "data:text/csv;base64," + base64.b64encode(df.to_csv(index=False).encode()).decode()
+
+    total = reduce_dataframe_chunks(inputCSV, lambda total, chunk: total + chunk["A"].sum(), 0, chunksize=7)
+    assert total == sum(range(25))
+
+    # without an initial value, the first chunk is the starting result
+    longest = reduce_dataframe_chunks(inputCSV, lambda a, b: a if len(a) >= len(b) else b, chunksize=7)
+    assert len(longest) == 7
+
+
 def test_print_dataframe():
     # get input data
     inputCSV = get_csv()
@@ -123,6 +361,150 @@ def test_print_dataframe():
     assert downloadHTMLxlsx.startswith("<a href=")
 
 
+
+def test_print_dataframe_fast_html():
+    df = pd.DataFrame(
+        {
+            "int": [1, 2, 3],
+            "float": [1.5, np.nan, 2.5],
+            "text": ["a<b", None, "c & d"],
+            "bool": [True, False, True],
+            "date": pd.to_datetime(["2020-01-01", None, "2021-06-30"]),
+            "nullable": pd.array([1, None, 3], dtype="Int64"),
+        }
+    )
+
+    # same markup as pandas
+    assert print_dataframe(df, fast_html=True) == df.to_html()
+
+    # floats are rounded to the display precision but not padded
+    html = print_dataframe(pd.DataFrame({"A": [0.123456789, 2.0]}), fast_html=True)
+    assert "<td>0.123457</td>" in html and "<td>2.0</td>" in html
+
+    # named and multi-level indexes fall back to pandas
+    named = df.rename_axis("row")
+    assert print_dataframe(named, fast_html=True) == named.to_html()
+
+
+def test_print_dataframe_max_rows():
+    df = pd.DataFrame({"A": range(10)})
+
+    for fast_html in (False, True):
+        html = print_dataframe(df, max_rows=3, fast_html=fast_html)
+        assert html.count("<tr>") == 3
+        assert html.endswith("<p>Showing 3 of 10 rows</p>")
+
+        # the download still contains every row
+        html, download_link = print_dataframe(df, download=True, max_rows=3, fast_html=fast_html)
+        encoded = download_link.split("base64,")[1].split("'")[0]
+        assert base64.b64decode(encoded).decode().split() == ["A"] + [str(i) for i in range(10)]
+
+    # no footer when every row is shown
+    assert "Showing" not in print_dataframe(df, max_rows=10)
+
+
+def test_print_dataframe_reuses_renders(monkeypatch):
+    df = pd.DataFrame({"A": [1, 2, 3], "B": ["x", "y", "z"]})
+
+    calls = []
+    to_csv = pd.DataFrame.to_csv
+
+    def counting_to_csv(self, *args, **kwargs):
+        calls.append(1)
+        return to_csv(self, *args, **kwargs)
+
+    monkeypatch.setattr(pd.DataFrame, "to_csv", counting_to_csv)
+
+    first = print_dataframe(df, download=True, cache=True)
+    assert print_dataframe(df, download=True, cache=True) == first
+    assert len(calls) == 1
+
+    # without cache=True nothing is reused
+    assert print_dataframe(df, download=True) == first
+    assert len(calls) == 2
+
+    # changing the DataFrame renders it again
+    df.loc[0, "A"] = 10
+    html, download_link = print_dataframe(df, download=True, cache=True)
+    assert len(calls) == 3
+    assert "<td>10</td>" in html
+    assert base64.b64decode(download_link.split("base64,")[1].split("'")[0]).decode().startswith("A,B\n10,x")
+
+    # renders are freed with the DataFrame
+    key = id(df)
+    assert key in spreadsheet_utils._render_cache
+    del df
+    gc.collect()
+    assert key not in spreadsheet_utils._render_cache
+
+
+def test_print_dataframe_preview_does_not_hash(monkeypatch):
+    df = pd.DataFrame({"A": np.arange(1_000_000), "B": np.arange(1_000_000) / 2})
+
+    def failing_fingerprint(df):
+        raise AssertionError("the whole DataFrame was hashed")
+
+    monkeypatch.setattr(spreadsheet_utils, "_dataframe_fingerprint", failing_fingerprint)
+
+    html = print_dataframe(df, max_rows=50)
+    assert html.count("<tr>") == 50
+    assert html.endswith("<p>Showing 50 of 1,000,000 rows</p>")
+    assert id(df) not in spreadsheet_utils._render_cache
+
+
+def test_download_is_encoded_while_written():
+    data = bytes(range(256)) * 10
+
+    # writes that don't line up with 3 byte Base64 groups
+    writer = spreadsheet_utils._Base64Writer("data:text/csv;base64,")
+    for start in range(0, len(data), 7):
+        writer.write(data[start : start + 7])
+    assert writer.getvalue() == "data:text/csv;base64," + base64.b64encode(data).decode()
+
+    df = pd.DataFrame({"A": range(1000), "B": ["text"] * 1000})
+    _, download_link = print_dataframe(df, download=True)
+    encoded = download_link.split("base64,")[1].split("'")[0]
+    assert base64.b64decode(encoded) == df.to_csv(index=False).encode()
+
+
+def read_download(download_link, file_format):
+    data = base64.b64decode(download_link.split("base64,")[1].split("'")[0])
+    if file_format == "csv.gz":
+        data = gzip.decompress(data)
+    elif file_format == "zip":
+        data = zipfile.ZipFile(io.BytesIO(data)).read("table.csv")
+    elif file_format == "parquet":
+        return pd.read_parquet(io.BytesIO(data))
+    elif file_format == "feather":
+        return pd.read_feather(io.BytesIO(data))
+    return pd.read_csv(io.BytesIO(data))
+
+
+@pytest.mark.parametrize("file_format", ["csv.gz", "zip", "parquet", "feather"])
+def test_print_dataframe_download_formats(file_format):
+    if file_format not in available_download_formats():
+        pytest.skip(f"{file_format} needs pyarrow")
+
+    df = pd.DataFrame({"A": range(100), "B": ["steel", "copper"] * 50})
+    _, download_link = print_dataframe(df, download=True, download_file_type=file_format)
+
+    assert download_link.endswith(f"download='mytable.{file_format}'>Download Table</a>")
+    pd.testing.assert_frame_equal(read_download(download_link, file_format), df, check_dtype=False)
+
+
+def test_print_dataframe_download_auto():
+    # repetitive data: compressed formats are much smaller than csv
+    df = pd.DataFrame({"A": [1] * 20_000, "B": ["steel"] * 20_000})
+    _, download_link = print_dataframe(df, download=True, download_file_type="auto")
+
+    file_format = download_link.split("download='mytable.")[1].split("'")[0]
+    assert file_format != "csv"
+    pd.testing.assert_frame_equal(read_download(download_link, file_format), df, check_dtype=False)
+
+    # "gzip" is an alias of "csv.gz"
+    _, download_link = print_dataframe(df, download=True, download_file_type="gzip")
+    assert "download='mytable.csv.gz'" in download_link
+
 # returns a base64 encoded image
 def get_csv():
     return getSpreadsheetInput(os.path.join(THIS_DIR, "./test_files/csvFile.csv"))
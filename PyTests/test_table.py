@@ -1,6 +1,10 @@
+import json
+import re
 import sys
 import os
+import numpy as np
 import pandas as pd
+import pytest
 
 # caution: path[0] is reserved for script path (or '' in REPL)
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -18,6 +22,62 @@ def test_table_to_dataframe():
     assert isinstance(df, pd.DataFrame)
 
 
+def test_table_to_dataframe_matches_rows():
+    header = ["A", "A", "B"]
+    rows = [["1", "2", "x"], ["3", "4", "y"]]
+    df = table_to_dataframe(header, rows)
+
+    # duplicate headers keep both columns
+    assert list(df.columns) == header
+    assert df.iloc[:, 1].tolist() == ["2", "4"]
+    pd.testing.assert_frame_equal(df, pd.DataFrame(rows, columns=header))
+
+    # no rows: empty columns
+    df = table_to_dataframe(["A", "B"], [])
+    assert list(df.columns) == ["A", "B"] and len(df) == 0
+
+
+def test_table_to_dataframe_reports_bad_rows():
+    rows = [["1", "2"], ["3"], ["4", "5"], ["6", "7", "8"]]
+    with pytest.raises(ValueError, match="Rows with a different length: 1, 3$"):
+        table_to_dataframe(["A", "B"], rows)
+
+    # long lists of bad rows are shortened
+    with pytest.raises(ValueError, match="and 5 more$"):
+        table_to_dataframe(["A", "B"], [["1"]] * 25)
+
+
+def test_table_to_dataframe_coerce():
+    header = ["plain", "separators", "units", "blanks", "text"]
+    rows = [
+        ["1", "1,234", "2.5 mm", "", "steel"],
+        ["2", "12,345.5", "10mm", "7", "copper"],
+        ["-3", "5", "1e3 mm", " ", "4"],
+    ]
+
+    df = table_to_dataframe(header, rows, coerce="auto")
+    assert df["plain"].tolist() == [1, 2, -3] and df["plain"].dtype.kind == "i"
+    assert df["separators"].tolist() == [1234, 12345.5, 5]
+    assert df["units"].tolist() == [2.5, 10, 1000]
+    assert np.isnan(df["blanks"][0]) and df["blanks"][1] == 7
+    # not every cell is a number: kept as strings
+    assert df["text"].tolist() == ["steel", "copper", "4"]
+
+    # "numeric" converts every column
+    df = table_to_dataframe(header, rows, coerce="numeric")
+    assert df["text"].isna().tolist() == [True, True, False]
+
+    # mixed units aren't converted by "auto"
+    df = table_to_dataframe(["A"], [["1 mm"], ["1 m"]], coerce="auto")
+    assert df["A"].tolist() == ["1 mm", "1 m"]
+
+    # strings are kept by default
+    assert table_to_dataframe(header, rows)["plain"].tolist() == ["1", "2", "-3"]
+
+    with pytest.raises(ValueError):
+        table_to_dataframe(header, rows, coerce="float")
+
+
 def test_print_table():
     # convert table data to html table
     header, data = makeTable()
@@ -25,6 +85,74 @@ def test_print_table():
     print(HTMLtable)
     assert HTMLtable.startswith("<table ")
 
+    # coerced floats are formatted as numbers
+    HTMLtable = print_table(["A", "B"], [["1", "1,000.5"], ["2", "3"]], index=False, coerce="auto")
+    assert "<td>1000.5</td>" in HTMLtable
+
+
+def test_print_table_paginated():
+    header = ["A", "B"]
+    rows = [[str(i), f"<b>{i}</b>"] for i in range(25)]
+    html = print_table(header, rows, page_size=10)
+
+    # only the first page is rendered as HTML
+    table = html.split("</table>")[0]
+    assert table.count("<tr>") == 10
+    assert "Page 1 of 3" in html
+
+    # the other rows are embedded as escaped JSON (index first)
+    embedded = json.loads(re.search(r'<script type="application/json">(.*?)</script>', html).group(1))
+    assert len(embedded) == 15
+    assert embedded[0] == ["10", "10", "&lt;b&gt;10&lt;/b&gt;"]
+    assert "<b>" not in html
+
+    # every table gets its own id
+    assert re.search(r'id="(.*?)"', html).group(1) != re.search(r'id="(.*?)"', print_table(header, rows, page_size=10)).group(1)
+
+    # without the index
+    html = print_table(header, rows, index=False, page_size=10)
+    embedded = json.loads(re.search(r'<script type="application/json">(.*?)</script>', html).group(1))
+    assert embedded[0] == ["10", "&lt;b&gt;10&lt;/b&gt;"]
+
+    # tables that fit on one page aren't paginated
+    assert print_table(header, rows, page_size=25) == print_table(header, rows)
+
+    with pytest.raises(ValueError):
+        print_table(header, rows, page_size=0)
+
+
+def test_print_table_paginated_floats():
+    header = ["A", "B", "C"]
+    values = ["1e20", "2", "3.25", "0.5", "12", "7.125"]
+    rows = [[values[i % 6], str(i / 4), values[(i + 1) % 6] if i % 5 else ""] for i in range(12)]
+
+    for index in (True, False):
+        full = print_table(header, rows, index=index, coerce="numeric")
+        paginated = print_table(header, rows, index=index, coerce="numeric", page_size=5)
+
+        # each page shows the cells exactly like the table without pagination
+        full_rows = re.findall(r"<tr>\n(.*?)</tr>", full, re.S)
+        page_rows = re.findall(r"<tr>\n(.*?)</tr>", paginated.split("</table>")[0], re.S)
+        assert page_rows == full_rows[:5]
+
+        full_cells = [re.findall(r"<t[hd]>(.*?)</t[hd]>", row) for row in full_rows]
+        embedded = json.loads(re.search(r'<script type="application/json">(.*?)</script>', paginated).group(1))
+        assert embedded == full_cells[5:]
+        assert "1.000000e+20" in full
+
+
+def test_format_floats_fallback(monkeypatch):
+    import types
+    import table_utils
+
+    df = pd.DataFrame({"A": [1e20, 2, np.nan, 0.5], "B": ["x", "y", "z", "w"], "C": [0.1, -3.25, 12, 7.125]})
+    expected = {index: table_utils._format_floats(df, index) for index in (True, False)}
+
+    # without pandas' private format_array, the columns are formatted through to_string
+    monkeypatch.setitem(sys.modules, "pandas.io.formats.format", types.ModuleType("pandas.io.formats.format"))
+    for index in (True, False):
+        assert table_utils._format_floats(df, index).equals(expected[index])
+
 
 def makeTable():
     header = ["A", "B", "C"]
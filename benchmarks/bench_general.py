@@ -0,0 +1,132 @@
+"""
+Benchmarks for mecsimcalc.file_utils.general_utils
+
+Usage: python benchmarks/bench_general.py [memory] [small_inputs] [batch]
+(the memory benchmark reads /proc and only runs on linux)
+"""
+import base64
+import io
+import os
+import resource
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from mimetypes import guess_type, guess_extension
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def legacy_input_to_file(input_file: str) -> io.BytesIO:
+    # input_to_file before the chunked decoder
+    meta, data = input_file.split(";base64,")
+    return io.BytesIO(base64.b64decode(data))
+
+
+def legacy_extension(meta_data: str) -> str:
+    # input_to_file's extension lookup before the MIME type table
+    return guess_extension(guess_type(meta_data)[0])
+
+
+def make_input(size_mb: int) -> str:
+    data = os.urandom(size_mb * 1024 * 1024)
+    return "data:application/octet-stream;base64," + base64.b64encode(data).decode()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on linux (bytes on macOS)
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+def measure_memory(implementation: str, size_mb: int) -> None:
+    # runs in a fresh process so ru_maxrss only reflects this implementation
+    from mecsimcalc.file_utils.general_utils import input_to_file
+
+    decode = {"legacy": legacy_input_to_file, "current": input_to_file}[implementation]
+    input_file = make_input(size_mb)
+
+    # generating the input allocates more than decoding does, so ru_maxrss alone would only show
+    # the input generation. tracemalloc gives the peak of the decode itself
+    tracemalloc.start()
+    rss_before = current_rss_mb()
+    file_data = decode(input_file)
+    rss_after = current_rss_mb()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{implementation:<8} {size_mb:>4} MB file: peak allocated while decoding {peak / 2**20:7.1f} MB, "
+        f"RSS retained {rss_after - rss_before:7.1f} MB, process peak RSS {peak_rss_mb():7.1f} MB"
+    )
+
+
+def bench_memory() -> None:
+    for size_mb in (10, 100):
+        for implementation in ("legacy", "current"):
+            subprocess.run(
+                [sys.executable, __file__, "_memory", implementation, str(size_mb)],
+                cwd=ROOT_DIR,
+                check=True,
+            )
+
+
+def bench_small_inputs(count: int = 10_000) -> None:
+    from mecsimcalc.file_utils.general_utils import (
+        input_to_file,
+        mime_type_to_extension,
+        _metadata_to_mime_type,
+    )
+
+    mime_types = [
+        "image/jpeg",
+        "image/png",
+        "text/csv",
+        "application/pdf",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "video/mp4",
+    ]
+    payload = base64.b64encode(os.urandom(256)).decode()
+    inputs = [f"data:{mime_types[i % len(mime_types)]};base64,{payload}" for i in range(count)]
+    metadata = [input_file[: input_file.index(",") + 1] for input_file in inputs]
+
+    cases = {
+        "extension lookup (mimetypes)": lambda: [legacy_extension(m) for m in metadata],
+        "extension lookup (table)": lambda: [mime_type_to_extension(_metadata_to_mime_type(m)) for m in metadata],
+        "input_to_file(get_file_extension=True)": lambda: [input_to_file(i, get_file_extension=True) for i in inputs],
+    }
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=5))
+        print(f"{name:<42} {count} inputs: {best * 1000:8.2f} ms ({best / count * 1e6:.2f} us/input)")
+
+
+def bench_batch(file_count: int = 16) -> None:
+    # Note: CPython's binascii holds the GIL while decoding, so the thread pool can only
+    # win on interpreters that release it (e.g. free-threaded builds)
+    from mecsimcalc.file_utils.general_utils import inputs_to_files
+
+    print(f"{file_count} files, {os.cpu_count()} CPUs, 4 threads")
+    print(f"{'file size':>10} {'serial (ms)':>12} {'threads (ms)':>13} {'speedup':>8}")
+    for size_kb in (16, 256, 1024, 4096, 16384):
+        payload = base64.b64encode(os.urandom(size_kb * 1024)).decode()
+        inputs = [f"data:text/csv;base64,{payload}"] * file_count
+
+        serial = min(timeit.repeat(lambda: inputs_to_files(inputs, serial_threshold=float("inf")), number=1, repeat=3))
+        threads = min(timeit.repeat(lambda: inputs_to_files(inputs, max_workers=4, serial_threshold=0), number=1, repeat=3))
+        print(f"{size_kb:>7} KB {serial * 1000:>12.1f} {threads * 1000:>13.1f} {serial / threads:>7.2f}x")
+
+
+BENCHMARKS = {"memory": bench_memory, "small_inputs": bench_small_inputs, "batch": bench_batch}
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["_memory"]:
+        measure_memory(sys.argv[2], int(sys.argv[3]))
+    else:
+        for name in sys.argv[1:] or BENCHMARKS:
+            print(f"--- {name} ---")
+            BENCHMARKS[name]()
@@ -0,0 +1,214 @@
+"""
+Benchmarks for mecsimcalc.file_utils.image_utils
+
+Usage: python benchmarks/bench_images.py [input_to_PIL] [preview] [download] [thumbnail] [formats] [batch]
+"""
+import base64
+import io
+import os
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def make_photo(width: int = 4032, height: int = 3024, format: str = "JPEG") -> str:
+    # smooth gradients plus noise compress roughly like a phone photo
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    noise = np.random.default_rng(0).normal(0, 12, (height, width))
+    channels = [x + 0 * y + noise, y + 0 * x + noise, (x + y) / 2 + noise]
+    pixels = np.clip(np.stack(channels, axis=-1), 0, 255).astype(np.uint8)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format=format, quality=90)
+    mime_type = Image.MIME[format]
+    return f"data:{mime_type};base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+
+def make_screenshot(width: int = 1920, height: int = 1080) -> Image.Image:
+    # flat UI panels and lines of text compress like a screenshot of an app
+    from PIL import ImageDraw
+
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width, 60), fill=(32, 64, 128))
+    draw.rectangle((0, 60, 280, height), fill=(240, 240, 240))
+    rng = np.random.default_rng(0)
+    for y in range(90, height - 20, 22):
+        draw.text((20, y), "Sidebar item", fill="black")
+        words = " ".join("".join(rng.choice(list("abcdefghij "), size=8)) for _ in range(12))
+        draw.text((310, y), words, fill=(40, 40, 40))
+    image.format = "PNG"
+    return image
+
+
+def legacy_input_to_PIL(input_file: str):
+    # input_to_PIL(get_file_extension=True) before it was restructured: the input was decoded twice
+    from mecsimcalc.file_utils.general_utils import input_to_file
+
+    image = Image.open(input_to_file(input_file))
+    _, file_extension = input_to_file(input_file, get_file_extension=True)
+    return image, file_extension
+
+
+def bench_input_to_PIL() -> None:
+    from mecsimcalc.file_utils.image_utils import input_to_PIL
+
+    photo = make_photo()
+    print(f"12 MP JPEG, {len(photo) / 2**20:.1f} MB of base64")
+    cases = {
+        "legacy (two decodes)": lambda: legacy_input_to_PIL(photo),
+        "input_to_PIL": lambda: input_to_PIL(photo, get_file_extension=True),
+    }
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=5))
+        print(f"{name:<24} {best * 1000:8.1f} ms")
+
+
+def loaded(image: Image.Image) -> Image.Image:
+    image.load()
+    return image
+
+
+def bench_preview() -> None:
+    from mecsimcalc.file_utils.image_utils import input_to_PIL, print_image
+
+    # tracemalloc doesn't see Pillow's pixel buffers, so memory is the size of the decoded image
+    print(f"{'photo':<16} {'case':<30} {'time (ms)':>10} {'decoded':>12} {'pixels (MB)':>12}")
+    for label, width, height, format in (
+        ("12 MP JPEG", 4032, 3024, "JPEG"),
+        ("24 MP JPEG", 6000, 4000, "JPEG"),
+        ("12 MP PNG", 4032, 3024, "PNG"),
+    ):
+        photo = make_photo(width, height, format)
+        # the image is loaded before print_image, as it is when the app reads pixels or the decode cache is on
+        cases = {
+            "loaded, then print_image": lambda: loaded(input_to_PIL(photo)),
+            "input_to_PIL(size=(200, 200))": lambda: loaded(input_to_PIL(photo, size=(200, 200))),
+        }
+        for name, case in cases.items():
+            best = min(timeit.repeat(lambda: print_image(case()), number=1, repeat=3))
+            image = case()
+            pixels = image.width * image.height * len(image.getbands())
+            decoded = f"{image.width}x{image.height}"
+            print(f"{label:<16} {name:<30} {best * 1000:>10.1f} {decoded:>12} {pixels / 2**20:>12.1f}")
+
+
+def legacy_print_image_download(image: Image.Image) -> tuple:
+    # print_image(download=True) before download_original: a full size copy, re-encoded for the link
+    download_image = image.copy()
+    buffer = io.BytesIO()
+    download_image.save(buffer, format=image.format)
+    encoded_data = f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+    image.thumbnail((200, 200))
+    buffer = io.BytesIO()
+    image.save(buffer, format=image.format)
+    return f"<img src='data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode()}'>", encoded_data
+
+
+def bench_download() -> None:
+    from mecsimcalc.file_utils.image_utils import input_to_PIL, print_image
+
+    photo = make_photo()
+    print(f"12 MP JPEG, {len(photo) / 2**20:.1f} MB of base64")
+    # name: (case, number of full size pixel buffers it decodes), tracemalloc doesn't see Pillow's pixel buffers
+    cases = {
+        "legacy (copy + re-encode)": (lambda: legacy_print_image_download(input_to_PIL(photo)), 2),
+        "download=True": (lambda: print_image(input_to_PIL(photo), download=True), 1),
+        "download_original=True": (
+            lambda: print_image(input_to_PIL(photo), download=True, download_original=True),
+            0,
+        ),
+    }
+    for name, (case, full_size_buffers) in cases.items():
+        tracemalloc.start()
+        case()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        best = min(timeit.repeat(case, number=1, repeat=3))
+        pixels = full_size_buffers * 4032 * 3024 * 3
+        print(f"{name:<26} {best * 1000:8.1f} ms, peak allocated {peak / 2**20:6.1f} MB + {pixels / 2**20:5.1f} MB of full size pixels")
+
+
+def legacy_print_image(image: Image.Image) -> str:
+    # print_image before the thumbnail pipeline: a copy to keep the caller's image, then thumbnail in place
+    preview = image.copy()
+    preview.thumbnail((200, 200))
+    buffer = io.BytesIO()
+    preview.save(buffer, format=image.format)
+    return f"<img src='data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode()}'>"
+
+
+def bench_thumbnail() -> None:
+    from mecsimcalc.file_utils.image_utils import input_to_PIL, print_image
+
+    # a loaded image the app keeps processing after showing it
+    image = loaded(input_to_PIL(make_photo()))
+    image.format = "JPEG"
+    print(f"{image.width}x{image.height} loaded JPEG, 200x200 preview")
+    cases = {
+        "legacy (copy + thumbnail)": lambda: legacy_print_image(image),
+        "BICUBIC, reducing_gap=2": lambda: print_image(image),
+        "BILINEAR, reducing_gap=1.5": lambda: print_image(image, resample=Image.BILINEAR, reducing_gap=1.5),
+        "NEAREST, reducing_gap=None": lambda: print_image(image, resample=Image.NEAREST, reducing_gap=None),
+        "LANCZOS, reducing_gap=None": lambda: print_image(image, resample=Image.LANCZOS, reducing_gap=None),
+        "cache_preview (repeated)": lambda: print_image(image, cache_preview=True),
+    }
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=5))
+        print(f"{name:<28} {best * 1000:8.2f} ms")
+
+
+def bench_formats() -> None:
+    from mecsimcalc.file_utils.image_utils import input_to_PIL, print_image, available_image_formats
+
+    photo = loaded(input_to_PIL(make_photo()))
+    fixtures = {"photo (12 MP JPEG)": photo, "screenshot (1080p PNG)": make_screenshot()}
+    print(f"{'image':<24} {'output_format':<14} {'200x200 preview':>22} {'original_size=True':>24}")
+    for label, image in fixtures.items():
+        for output_format in (None,) + available_image_formats() + ("auto",):
+            results = []
+            for original_size in (False, True):
+                case = lambda: print_image(image, original_size=original_size, output_format=output_format, quality=80)
+                elapsed = min(timeit.repeat(case, number=1, repeat=1 if original_size else 3))
+                results.append(f"{len(case()) * 3 / 4 / 1024:>9.1f} KB {elapsed * 1000:>8.1f} ms")
+            name = output_format or f"{image.format} (as is)"
+            print(f"{label:<24} {name:<14} {results[0]:>22} {results[1]:>24}")
+
+
+def bench_batch(count: int = 16) -> None:
+    from mecsimcalc.file_utils.image_utils import input_to_PIL, print_image, print_images
+
+    photos = [make_photo()] * count
+    print(f"{count} x 12 MP JPEG, 200x200 previews, {os.cpu_count()} CPUs")
+    cases = {
+        "loop (input_to_PIL + print_image)": lambda: [print_image(input_to_PIL(photo)) for photo in photos],
+        "print_images serial": lambda: print_images(photos, serial_threshold=count + 1),
+        "print_images 2 workers": lambda: print_images(photos, max_workers=2, serial_threshold=0),
+        "print_images 4 workers": lambda: print_images(photos, max_workers=4, serial_threshold=0),
+        "print_images (all CPUs)": lambda: print_images(photos, serial_threshold=0),
+    }
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=3))
+        print(f"{name:<34} {best * 1000:8.1f} ms ({best * 1000 / count:6.1f} ms per image)")
+
+
+BENCHMARKS = {
+    "input_to_PIL": bench_input_to_PIL,
+    "preview": bench_preview,
+    "download": bench_download,
+    "thumbnail": bench_thumbnail,
+    "formats": bench_formats,
+    "batch": bench_batch,
+}
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f"--- {name} ---")
+        BENCHMARKS[name]()
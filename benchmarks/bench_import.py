@@ -0,0 +1,46 @@
+"""
+Compares the cold import time of mecsimcalc against eagerly importing every submodule
+(which is what "import mecsimcalc" used to do).
+
+Usage: python benchmarks/bench_import.py [repeats]
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "import mecsimcalc (lazy)": "import mecsimcalc",
+    "import mecsimcalc + input_to_file": "import mecsimcalc; mecsimcalc.input_to_file",
+    "import mecsimcalc + input_to_dataframe": "import mecsimcalc; mecsimcalc.input_to_dataframe",
+    "eager (all submodules)": (
+        "import mecsimcalc.file_utils.general_utils, mecsimcalc.file_utils.image_utils, "
+        "mecsimcalc.file_utils.plotting_utils, mecsimcalc.file_utils.spreadsheet_utils, "
+        "mecsimcalc.file_utils.table_utils, mecsimcalc.file_utils.text_utils, "
+        "mecsimcalc.file_utils.quiz_utils, mecsimcalc.plot_draw"
+    ),
+}
+
+
+def time_import(code: str, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baseline = time_import("pass", repeats)
+    print(f"{'case':<42} {'best (ms)':>10} {'minus interpreter (ms)':>24}")
+    for name, code in CASES.items():
+        best = time_import(code, repeats)
+        print(f"{name:<42} {best * 1000:>10.1f} {(best - baseline) * 1000:>24.1f}")
+
+
+if __name__ == "__main__":
+    main()
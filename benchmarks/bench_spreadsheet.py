@@ -0,0 +1,237 @@
+"""
+Benchmarks for mecsimcalc.file_utils.spreadsheet_utils
+
+Usage: python benchmarks/bench_spreadsheet.py [file_to_dataframe] [chunks] [compact] [engines] [xlsx] [html] [download] [formats]
+"""
+import io
+import os
+import base64
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def make_dataframe(rows: int, columns: int = 8) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    data = {f"value_{i}": rng.normal(size=rows) for i in range(columns - 2)}
+    data["count"] = rng.integers(0, 1000, size=rows)
+    data["material"] = rng.choice(["steel", "aluminium", "copper", "titanium"], size=rows)
+    return pd.DataFrame(data)
+
+
+def make_file(df: pd.DataFrame, file_type: str) -> bytes:
+    buffer = io.BytesIO()
+    if file_type == "csv":
+        df.to_csv(buffer, index=False)
+    elif file_type == "xls":
+        df.to_excel(buffer, index=False, engine="xlwt")
+    else:
+        df.to_excel(buffer, index=False, engine="openpyxl")
+    return buffer.getvalue()
+
+
+def legacy_file_to_dataframe(file: io.BytesIO) -> pd.DataFrame:
+    # file_to_dataframe before format detection: always tries csv first
+    try:
+        return pd.read_csv(file)
+    except Exception:
+        return pd.read_excel(file, engine="openpyxl" if file.getvalue()[:2] == b"PK" else None)
+
+
+def bench_file_to_dataframe() -> None:
+    from mecsimcalc.file_utils.spreadsheet_utils import file_to_dataframe
+
+    df = make_dataframe(5000)
+    print(f"{'format':<6} {'legacy (ms)':>12} {'sniffed (ms)':>13}")
+    for file_type in ("csv", "xlsx", "xls"):
+        try:
+            data = make_file(df, file_type)
+        except (ImportError, ValueError):
+            print(f"{file_type:<6} skipped (no writer installed)")
+            continue
+
+        timings = []
+        for parse in (legacy_file_to_dataframe, file_to_dataframe):
+            timings.append(min(timeit.repeat(lambda: parse(io.BytesIO(data)), number=1, repeat=5)))
+        print(f"{file_type:<6} {timings[0] * 1000:>12.1f} {timings[1] * 1000:>13.1f}")
+
+
+def bench_chunks(rows: int = 1_000_000) -> None:
+    from mecsimcalc.file_utils.spreadsheet_utils import input_to_dataframe, reduce_dataframe_chunks
+
+    input_file = "data:text/csv;base64," + base64.b64encode(make_file(make_dataframe(rows), "csv")).decode()
+    print(f"{rows} rows, {len(input_file) / 2**20:.1f} MB of base64")
+
+    cases = {
+        "input_to_dataframe + sum": lambda: input_to_dataframe(input_file)["count"].sum(),
+        "reduce_dataframe_chunks": lambda: reduce_dataframe_chunks(
+            input_file, lambda total, chunk: total + chunk["count"].sum(), 0, chunksize=50_000
+        ),
+    }
+    for name, case in cases.items():
+        tracemalloc.start()
+        result = case()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        best = min(timeit.repeat(case, number=1, repeat=3))
+        print(f"{name:<26} result {result}, {best * 1000:8.1f} ms, peak allocated {peak / 2**20:7.1f} MB")
+
+
+def bench_compact(rows: int = 1_000_000) -> None:
+    from mecsimcalc.file_utils.spreadsheet_utils import input_to_dataframe
+
+    input_file = "data:text/csv;base64," + base64.b64encode(make_file(make_dataframe(rows), "csv")).decode()
+    print(f"{rows} rows")
+
+    dtype = {f"value_{i}": "float32" for i in range(6)}
+    dtype.update({"count": "uint16", "material": "category"})
+    cases = {
+        "default": {},
+        "compact=True": {"compact": True},
+        "dtype hints": {"dtype": dtype},
+        "usecols + compact": {"usecols": ["count", "material"], "compact": True},
+    }
+    for name, options in cases.items():
+        best = min(timeit.repeat(lambda: input_to_dataframe(input_file, **options), number=1, repeat=3))
+        memory = input_to_dataframe(input_file, **options).memory_usage(deep=True).sum()
+        print(f"{name:<20} {best * 1000:8.1f} ms, DataFrame memory {memory / 2**20:7.1f} MB")
+
+
+def bench_engines() -> None:
+    from mecsimcalc.file_utils.spreadsheet_utils import file_to_dataframe, available_csv_engines
+
+    engines = ("auto",) + available_csv_engines()
+    print(f"{'upload':<22}" + "".join(f"{engine + ' (ms)':>16}" for engine in engines))
+    for label, rows in (("small (1k rows)", 1_000), ("medium (100k rows)", 100_000), ("large (1M rows)", 1_000_000)):
+        data = make_file(make_dataframe(rows), "csv")
+        timings = []
+        for engine in engines:
+            if engine == "python" and rows > 100_000:
+                timings.append(float("nan"))  # too slow to be worth waiting for
+                continue
+            parse = lambda: file_to_dataframe(io.BytesIO(data), file_type="csv", engine=engine)
+            timings.append(min(timeit.repeat(parse, number=1, repeat=3)))
+        print(f"{label:<22}" + "".join(f"{timing * 1000:>16.1f}" for timing in timings))
+
+
+def make_workbook(rows: int) -> bytes:
+    # openpyxl's write-only mode keeps generating large workbooks fast
+    from openpyxl import Workbook
+
+    df = make_dataframe(rows)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Data")
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        sheet.append([value.item() if hasattr(value, "item") else value for value in row])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def bench_xlsx(rows: int = 100_000) -> None:
+    from mecsimcalc.file_utils.spreadsheet_utils import xlsx_to_dataframe
+
+    rows = int(os.environ.get("BENCH_XLSX_ROWS", rows))
+    data = make_workbook(rows)
+    print(f"{rows} rows, {len(data) / 2**20:.1f} MB workbook (set BENCH_XLSX_ROWS to change)")
+
+    cases = {
+        "pd.read_excel (openpyxl)": lambda: pd.read_excel(io.BytesIO(data), engine="openpyxl"),
+        "xlsx_to_dataframe": lambda: xlsx_to_dataframe(io.BytesIO(data)),
+        "xlsx_to_dataframe nrows=1000": lambda: xlsx_to_dataframe(io.BytesIO(data), nrows=1000),
+    }
+    for name, case in cases.items():
+        # tracemalloc slows openpyxl down a lot, so time and measure memory in separate runs
+        elapsed = min(timeit.repeat(case, number=1, repeat=2))
+        tracemalloc.start()
+        case()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:<30} {elapsed * 1000:9.1f} ms, peak allocated {peak / 2**20:8.1f} MB")
+
+
+def bench_html() -> None:
+    from mecsimcalc.file_utils.spreadsheet_utils import print_dataframe
+
+    print(f"{'rows':>9} {'to_html (ms)':>14} {'fast_html (ms)':>15} {'max_rows=1000 (ms)':>19}")
+    for rows in (10_000, 100_000, 1_000_000):
+        df = make_dataframe(rows)
+        cases = (
+            lambda: print_dataframe(df),
+            lambda: print_dataframe(df, fast_html=True),
+            lambda: print_dataframe(df, fast_html=True, max_rows=1000),
+        )
+        timings = [min(timeit.repeat(case, number=1, repeat=1 if rows >= 1_000_000 else 3)) for case in cases]
+        print(f"{rows:>9} " + " ".join(f"{timing * 1000:>{width}.1f}" for timing, width in zip(timings, (14, 15, 19))))
+
+
+def legacy_csv_download(df: pd.DataFrame) -> str:
+    # print_dataframe(download=True) before the render-once pipeline
+    buffer = io.BytesIO()
+    buffer.write(df.to_csv(index=False).encode())
+    return "data:text/csv;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def bench_download(rows: int = 500_000) -> None:
+    from mecsimcalc.file_utils.spreadsheet_utils import print_dataframe, _encode_download
+
+    df = make_dataframe(rows)
+    print(f"{rows} rows, csv download")
+
+    cases = {
+        "legacy": lambda: legacy_csv_download(df),
+        "render once": lambda: _encode_download(df, "csv"),
+        "print_dataframe repeated": lambda: print_dataframe(df, download=True, max_rows=100, fast_html=True, cache=True),
+    }
+    for name, case in cases.items():
+        tracemalloc.start()
+        case()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        # the repeated case is already cached by the tracemalloc run
+        elapsed = min(timeit.repeat(case, number=1, repeat=3))
+        print(f"{name:<26} {elapsed * 1000:9.1f} ms, peak allocated {peak / 2**20:8.1f} MB")
+
+
+def bench_formats(rows: int = 200_000) -> None:
+    from mecsimcalc.file_utils.spreadsheet_utils import (
+        available_download_formats,
+        _encode_download,
+        _smallest_download_format,
+    )
+
+    df = make_dataframe(rows)
+    print(f"{rows} rows")
+    print(f"{'format':<10} {'data URL (MB)':>14} {'encode (ms)':>12}")
+    for file_format in available_download_formats():
+        elapsed = min(timeit.repeat(lambda: _encode_download(df, file_format), number=1, repeat=2))
+        size = len(_encode_download(df, file_format))
+        print(f"{file_format:<10} {size / 2**20:>14.1f} {elapsed * 1000:>12.1f}")
+
+    elapsed = min(timeit.repeat(lambda: _smallest_download_format(df), number=1, repeat=3))
+    print(f"auto picks {_smallest_download_format(df)} (estimate takes {elapsed * 1000:.1f} ms)")
+
+
+BENCHMARKS = {
+    "file_to_dataframe": bench_file_to_dataframe,
+    "chunks": bench_chunks,
+    "compact": bench_compact,
+    "engines": bench_engines,
+    "xlsx": bench_xlsx,
+    "html": bench_html,
+    "download": bench_download,
+    "formats": bench_formats,
+}
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f"--- {name} ---")
+        BENCHMARKS[name]()
@@ -0,0 +1,97 @@
+"""
+Benchmarks for mecsimcalc.file_utils.table_utils
+
+Usage: python benchmarks/bench_table.py [table_to_dataframe] [coerce] [print_table]
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def make_table(rows: int, columns: int = 10):
+    # the table widget delivers every cell as a string
+    rng = np.random.default_rng(0)
+    headers = [f"column_{i}" for i in range(columns)]
+    values = rng.normal(size=(rows, columns)).round(4).astype(str)
+    return headers, values.tolist()
+
+
+def legacy_table_to_dataframe(column_headers, rows):
+    # table_to_dataframe before bulk validation
+    for row in rows:
+        if len(row) != len(column_headers):
+            raise ValueError("Each row must have the same length as the column headers")
+    return pd.DataFrame(rows, columns=column_headers)
+
+
+def bench_table_to_dataframe() -> None:
+    from mecsimcalc.file_utils.table_utils import table_to_dataframe
+
+    print(f"{'rows':>8} {'legacy (ms)':>12} {'table_to_dataframe (ms)':>24}")
+    for rows in (1_000, 10_000, 100_000):
+        headers, table = make_table(rows)
+        timings = [
+            min(timeit.repeat(lambda: convert(headers, table), number=1, repeat=5))
+            for convert in (legacy_table_to_dataframe, table_to_dataframe)
+        ]
+        print(f"{rows:>8} {timings[0] * 1000:>12.1f} {timings[1] * 1000:>24.1f}")
+
+
+def float_loop(column_headers, rows):
+    # what apps do without coerce: parse every cell with float()
+    from mecsimcalc.file_utils.table_utils import table_to_dataframe
+
+    parsed = [[float(cell.replace(",", "").rstrip(" mm")) if cell.strip() else np.nan for cell in row] for row in rows]
+    return table_to_dataframe(column_headers, parsed)
+
+
+def bench_coerce(rows: int = 100_000) -> None:
+    from mecsimcalc.file_utils.table_utils import table_to_dataframe
+
+    headers, plain = make_table(rows)
+    # thousands separators, units and blanks
+    formatted = [[f"{float(cell) * 1000:,.1f} mm" if i % 50 else "" for cell in row] for i, row in enumerate(plain)]
+
+    print(f"{rows} rows x {len(headers)} columns")
+    print(f"{'cells':<10} {'float() loop (ms)':>18} {'coerce=numeric (ms)':>20} {'coerce=auto (ms)':>17}")
+    for label, table in (("plain", plain), ("formatted", formatted)):
+        timings = [
+            min(timeit.repeat(convert, number=1, repeat=3))
+            for convert in (
+                lambda: float_loop(headers, table),
+                lambda: table_to_dataframe(headers, table, coerce="numeric"),
+                lambda: table_to_dataframe(headers, table, coerce="auto"),
+            )
+        ]
+        print(f"{label:<10} {timings[0] * 1000:>18.1f} {timings[1] * 1000:>20.1f} {timings[2] * 1000:>17.1f}")
+
+
+def bench_print_table() -> None:
+    from mecsimcalc.file_utils.table_utils import print_table
+
+    print(f"{'rows':>8} {'full (ms)':>10} {'full (MB)':>10} {'page_size=50 (ms)':>18} {'page_size=50 (MB)':>18}")
+    for rows in (1_000, 10_000, 100_000):
+        headers, table = make_table(rows)
+        results = []
+        for options in ({}, {"page_size": 50}):
+            elapsed = min(timeit.repeat(lambda: print_table(headers, table, **options), number=1, repeat=3))
+            results += [elapsed * 1000, len(print_table(headers, table, **options)) / 2**20]
+        print(f"{rows:>8} {results[0]:>10.1f} {results[1]:>10.1f} {results[2]:>18.1f} {results[3]:>18.1f}")
+
+
+BENCHMARKS = {
+    "table_to_dataframe": bench_table_to_dataframe,
+    "coerce": bench_coerce,
+    "print_table": bench_print_table,
+}
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f"--- {name} ---")
+        BENCHMARKS[name]()
@@ -1,43 +1,121 @@
-# included in __all__: import using "from mecsimcalc import *" or "import mecsimcalc"
-
-from .file_utils.general_utils import input_to_file, metadata_to_filetype
+import sys
+from importlib import import_module
 
-from .file_utils.image_utils import input_to_PIL, file_to_PIL, print_image
+# Submodules are imported on first attribute access (PEP 562), so "import mecsimcalc"
+# doesn't pay for matplotlib, plotly, pandas, etc. until a function that needs them is used.
 
+# included in __all__: import using "from mecsimcalc import *" or "import mecsimcalc"
+_LAZY_ATTRIBUTES = {
+    "input_to_file": ".file_utils.general_utils",
+    "inputs_to_files": ".file_utils.general_utils",
+    "metadata_to_filetype": ".file_utils.general_utils",
+    "Base64Reader": ".file_utils.general_utils",
+    "sniff_extension": ".file_utils.sniff_utils",
+    "DecodeCache": ".file_utils.cache_utils",
+    "enable_decode_cache": ".file_utils.cache_utils",
+    "disable_decode_cache": ".file_utils.cache_utils",
+    "decode_cache_info": ".file_utils.cache_utils",
+    "input_to_PIL": ".file_utils.image_utils",
+    "file_to_PIL": ".file_utils.image_utils",
+    "print_image": ".file_utils.image_utils",
+    "print_images": ".file_utils.image_utils",
+    "available_image_formats": ".file_utils.image_utils",
+    "print_plot": ".file_utils.plotting_utils",
+    "print_animation": ".file_utils.plotting_utils",
+    "animate_plot": ".file_utils.plotting_utils",
+    "plot_slider": ".file_utils.plotting_utils",
+    "input_to_dataframe": ".file_utils.spreadsheet_utils",
+    "file_to_dataframe": ".file_utils.spreadsheet_utils",
+    "print_dataframe": ".file_utils.spreadsheet_utils",
+    "compact_dataframe": ".file_utils.spreadsheet_utils",
+    "available_csv_engines": ".file_utils.spreadsheet_utils",
+    "available_download_formats": ".file_utils.spreadsheet_utils",
+    "xlsx_to_dataframe": ".file_utils.spreadsheet_utils",
+    "Workbook": ".file_utils.spreadsheet_utils",
+    "input_to_workbook": ".file_utils.spreadsheet_utils",
+    "iter_dataframe_chunks": ".file_utils.spreadsheet_utils",
+    "reduce_dataframe_chunks": ".file_utils.spreadsheet_utils",
+    "table_to_dataframe": ".file_utils.table_utils",
+    "print_table": ".file_utils.table_utils",
+    "string_to_file": ".file_utils.text_utils",
+    "append_to_google_sheet": ".file_utils.quiz_utils",
+    "send_gmail": ".file_utils.quiz_utils",
+}
 
-from .file_utils.plotting_utils import (
-    print_plot,
-    print_animation,
-    animate_plot,
-    plot_slider,
+# not included in __all__: import using "from mecsimcalc.plot_draw import *" or "import mecsimcalc.plot_draw"
+_LAZY_ATTRIBUTES.update(
+    dict.fromkeys(
+        [
+            "draw_arrow",
+            "calculate_midpoint",
+            "draw_arc",
+            "blank_canvas",
+            "draw_three_axes",
+            "draw_two_inclined_axes",
+            "calculate_arrow_endpoint",
+            "draw_circle",
+            "draw_rounded_rectangle",
+            "calculate_intersection_point",
+            "draw_line",
+            "draw_three_axes_rotated",
+            "draw_double_arrowhead",
+            "draw_two_axes",
+            "vertical_arrow_rain",
+            "horizontal_arrow_rain",
+            "calculate_angle",
+            "get_arc_points",
+        ],
+        ".plot_draw",
+    )
 )
 
+_LAZY_SUBMODULES = {"file_utils", "plot_draw"}
 
-from .file_utils.spreadsheet_utils import (
-    input_to_dataframe,
-    file_to_dataframe,
-    print_dataframe,
-)
 
-from .file_utils.table_utils import table_to_dataframe, print_table
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return import_module(f".{name}", __name__)
 
-from .file_utils.text_utils import string_to_file
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from .file_utils.quiz_utils import append_to_google_sheet, send_gmail
+    value = getattr(import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+
+    # cache the attribute so __getattr__ is only called once per name
+    globals()[name] = value
+    return value
 
-# not included in __all__: import using "from mecsimcalc.plot_draw import *" or "import mecsimcalc.plot_draw"
-from .plot_draw import *
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBMODULES)
 
 
 __all__ = [
     "input_to_dataframe",
     "file_to_dataframe",
+    "compact_dataframe",
+    "available_csv_engines",
+    "available_download_formats",
+    "xlsx_to_dataframe",
+    "Workbook",
+    "input_to_workbook",
+    "iter_dataframe_chunks",
+    "reduce_dataframe_chunks",
     "input_to_file",
-    "metadata_to_filetype" # Deprecated
+    "inputs_to_files",
+    "metadata_to_filetype",  # Deprecated
+    "Base64Reader",
+    "sniff_extension",
+    "DecodeCache",
+    "enable_decode_cache",
+    "disable_decode_cache",
+    "decode_cache_info",
     "input_to_PIL",
     "table_to_dataframe",
     "print_dataframe",
     "print_image",
+    "print_images",
+    "available_image_formats",
     "string_to_file",
     "print_table",
     "print_plot",
@@ -48,3 +126,8 @@ __all__ = [
     "animate_plot",
     "plot_slider",
 ]
+
+# Module level __getattr__ is only supported on python 3.7+, so python 3.6 imports everything eagerly
+if sys.version_info < (3, 7):
+    for _name in _LAZY_ATTRIBUTES:
+        __getattr__(_name)
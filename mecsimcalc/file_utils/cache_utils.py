@@ -0,0 +1,212 @@
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple, Hashable
+
+# Number of characters hashed at a time, so the input string is never copied in full
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def payload_digest(input_file: str) -> str:
+    """Returns a hex digest of a Base64 encoded input (metadata included)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for start in range(0, len(input_file), HASH_CHUNK_SIZE):
+        digest.update(input_file[start : start + HASH_CHUNK_SIZE].encode())
+    return digest.hexdigest()
+
+
+class DecodeCache:
+    """
+    >>> DecodeCache(max_bytes: int = 64 * 1024 * 1024, directory: Optional[str] = None)
+
+    Two tier cache for decoded inputs, keyed by a hash of the Base64 encoded input.
+
+    The memory tier holds decoded files and parsed objects (DataFrames, images) and evicts the least recently
+    used entries once their total size exceeds `max_bytes`. The optional disk tier stores decoded file data
+    under `directory` so it survives between runs. It is not size limited.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        The maximum total size of the memory tier in bytes. Defaults to `64 MB`.
+    directory : str, optional
+        The directory used for the disk tier (e.g., "/tmp/mecsimcalc"). Defaults to `None` (no disk tier).
+
+    Examples
+    --------
+    >>> cache = msc.enable_decode_cache(directory="/tmp/mecsimcalc")
+    >>> df = msc.input_to_dataframe(inputs["input_file"])
+    >>> print(cache.info())
+    {'hits': 0, 'misses': 1, 'disk_hits': 0, 'entries': 2, 'size': 1234, 'max_bytes': 67108864}
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, directory: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: Hashable, count: bool = True) -> Optional[Any]:
+        """
+        Returns the cached value for key (or None), updating the hit/miss counters unless count is False (for lookups
+        that are part of a call that was already counted).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += count
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += count
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        """Stores value in the memory tier, evicting the least recently used entries if necessary."""
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+
+            self._entries[key] = (value, size)
+            self.size += size
+
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def get_file(self, digest: str, count: bool = True) -> Optional[bytes]:
+        """Returns the decoded file data for a payload digest from the memory or disk tier."""
+        data = self.get(("file", digest), count)
+        if data is not None or self.directory is None:
+            return data
+
+        try:
+            with open(self._disk_path(digest), "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        with self._lock:
+            # the lookup already counted as a miss in the memory tier
+            self.misses -= count
+            self.hits += count
+            self.disk_hits += 1
+        self.put(("file", digest), data, len(data))
+        return data
+
+    def put_file(self, digest: str, data: bytes) -> None:
+        """Stores decoded file data in the memory tier and the disk tier."""
+        self.put(("file", digest), data, len(data))
+        if self.directory is None:
+            return
+
+        # write to a temporary file first so other processes never read a partial file. A disk tier that
+        # can't be written (e.g., removed or read-only) is skipped, the data is already in the memory tier
+        temp_path = None
+        try:
+            handle, temp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(handle, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, self._disk_path(digest))
+        except OSError:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def clear(self) -> None:
+        """Empties the memory tier and resets the counters (the disk tier is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+            self.size = self.hits = self.misses = self.disk_hits = 0
+
+    def info(self) -> dict:
+        """Returns the hit/miss counters and the size of the memory tier."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "entries": len(self._entries),
+            "size": self.size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _disk_path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.bin")
+
+
+_decode_cache = None
+
+
+def enable_decode_cache(max_bytes: int = 64 * 1024 * 1024, directory: Optional[str] = None) -> DecodeCache:
+    """
+    >>> enable_decode_cache(max_bytes: int = 64 * 1024 * 1024, directory: Optional[str] = None) -> DecodeCache
+
+    Enables caching for `input_to_file`, `input_to_dataframe` and `input_to_PIL`. Inputs that were already decoded
+    are returned from the cache instead of being decoded and parsed again.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        The maximum size of the in-memory cache in bytes. Defaults to `64 MB`.
+    directory : str, optional
+        If set, decoded files are also stored in this directory (e.g., "/tmp/mecsimcalc") and reused by later runs.
+        Defaults to `None`.
+
+    Returns
+    -------
+    * `DecodeCache` :
+        The cache that is now in use. `cache.info()` returns its hit/miss counters.
+
+    Examples
+    --------
+    >>> msc.enable_decode_cache(directory="/tmp/mecsimcalc")
+    >>> df = msc.input_to_dataframe(inputs["input_file"])
+    """
+    global _decode_cache
+    _decode_cache = DecodeCache(max_bytes, directory)
+    return _decode_cache
+
+
+def disable_decode_cache() -> None:
+    """
+    >>> disable_decode_cache() -> None
+
+    Disables the cache enabled by `enable_decode_cache`.
+    """
+    global _decode_cache
+    _decode_cache = None
+
+
+def get_decode_cache() -> Optional[DecodeCache]:
+    """Returns the cache enabled by `enable_decode_cache`, or None if caching is disabled."""
+    return _decode_cache
+
+
+def decode_cache_info() -> Optional[dict]:
+    """
+    >>> decode_cache_info() -> Optional[dict]
+
+    Returns the hit/miss counters of the decode cache, or None if caching is disabled.
+
+    Examples
+    --------
+    >>> print(msc.decode_cache_info())
+    {'hits': 3, 'misses': 1, 'disk_hits': 0, 'entries': 2, 'size': 1234, 'max_bytes': 67108864}
+    """
+    return None if _decode_cache is None else _decode_cache.info()
+
+
+def cache_key(kind: str, digest: str, *options: Any) -> Tuple[str, str, str]:
+    """Builds a memory tier key for a parsed object (options are the arguments that affect parsing)."""
+    return (kind, digest, repr(options))
@@ -1,10 +1,18 @@
 import io
 import base64
+import binascii
+import os
 import re
-from typing import Union, Tuple
-from mimetypes import guess_type, guess_extension
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Union, Tuple, Optional, Mapping, Sequence, Dict, List
+from mimetypes import guess_extension
 from warnings import warn
 
+from mecsimcalc.file_utils.cache_utils import get_decode_cache, payload_digest
+from mecsimcalc.file_utils.sniff_utils import sniff_extension
+
 # This is only necessary for python 3.6
 EXTENSION_MAP = {
     ".jpe": ".jpg",
@@ -13,14 +21,232 @@ EXTENSION_MAP = {
     # Add more mappings as necessary
 }
 
+# Extensions for the MIME types MecSimCalc usually sends. Looking these up directly avoids
+# initializing the mimetypes database (which reads system files) on every cold start
+MIME_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/bmp": ".bmp",
+    "image/webp": ".webp",
+    "image/tiff": ".tiff",
+    "image/svg+xml": ".svg",
+    "text/csv": ".csv",
+    "text/plain": ".txt",
+    "text/html": ".html",
+    "application/json": ".json",
+    "application/pdf": ".pdf",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": ".xlsx",
+    "application/vnd.ms-excel": ".xls",
+    "application/vnd.oasis.opendocument.spreadsheet": ".ods",
+}
+
+# The metadata ("data:<MIME type>;base64,") is always at the start of the input, so ";base64," is
+# looked for in this many characters first, without scanning the (potentially huge) file data
+MAX_METADATA_LENGTH = 1024
+
+# Number of base64 characters decoded at a time (must be a multiple of 4)
+DECODE_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Characters that line wrapped Base64 data contains, which Base64Reader can't skip
+BASE64_WHITESPACE = ("\n", "\r", " ", "\t")
+
+# Below this many base64 characters in total, inputs_to_files decodes serially on free-threaded builds
+# (starting threads costs more than it saves for small inputs). binascii holds the GIL while decoding,
+# so on regular CPython builds threads can't decode concurrently and inputs_to_files is always serial by default
+PARALLEL_DECODE_THRESHOLD = 16 * 1024 * 1024
+
+
+def _gil_enabled() -> bool:
+    """Returns False on free-threaded Python builds (3.13+) running without the GIL."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is None or is_gil_enabled()
+
+
+def _metadata_to_mime_type(meta_data: str) -> str:
+    """Extracts the MIME type from metadata in the form "data:<MIME type>[;<parameters>];base64,"."""
+    mime_type = meta_data[5:] if meta_data[:5].lower() == "data:" else meta_data
+    mime_type = mime_type.split(";", 1)[0].strip().lower()
+
+    # same fallback as mimetypes.guess_type uses for data urls
+    if "/" not in mime_type or "=" in mime_type:
+        return "text/plain"
+    return mime_type
+
+
+@lru_cache(maxsize=128)
+def _guess_extension(mime_type: str) -> Optional[str]:
+    """Looks up MIME types that aren't in MIME_TYPE_EXTENSIONS in the mimetypes database."""
+    extension = guess_extension(mime_type)
+    return EXTENSION_MAP.get(extension, extension)  # Only necessary for python 3.6
+
+
+def mime_type_to_extension(mime_type: str) -> Optional[str]:
+    """Returns the file extension (e.g., ".csv") for a MIME type, or None if it is unknown."""
+    return MIME_TYPE_EXTENSIONS.get(mime_type) or _guess_extension(mime_type)
+
+
+def _split_metadata(input_file: str) -> Tuple[str, int]:
+    """Returns the metadata and the index where the base64 file data starts."""
+    separator = input_file.find(";base64,", 0, MAX_METADATA_LENGTH)
+    if separator == -1:
+        # longer metadata, e.g. with ";name=..." parameters
+        separator = input_file.find(";base64,")
+    if separator == -1:
+        raise ValueError("Invalid input: must contain ';base64,'")
+
+    data_start = separator + len(";base64,")
+    return input_file[:data_start], data_start
+
+
+def _decode_base64(input_file: str, start: int = 0) -> io.BytesIO:
+    """Decodes input_file[start:] chunk by chunk, without copying the whole base64 string."""
+    file_data = io.BytesIO()
+    try:
+        for chunk_start in range(start, len(input_file), DECODE_CHUNK_SIZE):
+            chunk = input_file[chunk_start : chunk_start + DECODE_CHUNK_SIZE]
+            file_data.write(binascii.a2b_base64(chunk))
+    except binascii.Error:
+        # Chunks are only aligned if the data has no whitespace (line breaks, etc.)
+        file_data = io.BytesIO(base64.b64decode(input_file[start:]))
+
+    file_data.seek(0)
+    return file_data
+
+
+def _decode_cached(input_file: str, start: int = 0, digest: Optional[str] = None) -> io.BytesIO:
+    """
+    Decodes input_file[start:], reusing the decode cache if it is enabled. Callers that already looked up a parsed
+    object for this input pass its digest, so the input isn't hashed again and the lookup isn't counted twice.
+    """
+    cache = get_decode_cache()
+    if cache is None:
+        return _decode_base64(input_file, start)
+
+    count = digest is None
+    digest = digest or payload_digest(input_file)
+    data = cache.get_file(digest, count)
+    if data is not None:
+        return io.BytesIO(data)
+
+    file_data = _decode_base64(input_file, start)
+    cache.put_file(digest, file_data.getvalue())
+    return file_data
+
+
+def _decode_input(input_file: str, sniff: bool = False, digest: Optional[str] = None) -> Tuple[io.BytesIO, str]:
+    """Same as input_to_file(input_file, get_file_extension=True, sniff=sniff), reusing the digest (see _decode_cached)."""
+    meta_data, data_start = _split_metadata(input_file)
+    file_data = _decode_cached(input_file, data_start, digest)
+
+    extension = mime_type_to_extension(_metadata_to_mime_type(meta_data))
+    if sniff:
+        extension = sniff_extension(file_data, default=extension)
+    return file_data, extension
+
+
+class Base64Reader(io.RawIOBase):
+    """
+    >>> Base64Reader(input_file: str)
+
+    A read-only file object that decodes a Base64 encoded string on demand. Only the bytes that are read are decoded,
+    so large files can be read sequentially (e.g., by `pd.read_csv` or `PIL.Image.open`) without decoding them up front.
+
+    Parameters
+    ----------
+    input_file : str
+        A Base64 encoded string prefixed with its metadata (`data:<MIME type>;base64,`).
+
+    Raises
+    ------
+    * `ValueError` :
+        If the input string does not contain ";base64,", or if the Base64 data contains whitespace (e.g., line breaks).
+
+    Examples
+    --------
+    >>> input_file = inputs["input_file"]
+    >>> open_file = msc.Base64Reader(input_file)
+    >>> header = open_file.read(100)
+
+    (only the first 100 bytes of the file have been decoded)
+    """
+
+    def __init__(self, input_file: str):
+        super().__init__()
+        self.metadata, self._start = _split_metadata(input_file)
+        self._data = input_file
+        self._position = 0
+
+        # offsets into the data are computed from byte positions, so every character must be Base64
+        if any(input_file.find(character, self._start) != -1 for character in BASE64_WHITESPACE):
+            raise ValueError("Invalid input: Base64 data must not contain whitespace")
+
+        encoded_length = len(input_file) - self._start
+        if encoded_length % 4:
+            raise ValueError("Invalid input: Base64 data length must be a multiple of 4")
+
+        padding = input_file.endswith("==", self._start) + input_file.endswith("=", self._start)
+        self.size = encoded_length // 4 * 3 - padding
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self.size - self._position)
+        if length <= 0:
+            return 0
+
+        # every 4 Base64 characters decode to 3 bytes, so decode the smallest aligned window
+        first_group = self._position // 3
+        last_group = -(-(self._position + length) // 3)
+        window = binascii.a2b_base64(self._data[self._start + first_group * 4 : self._start + last_group * 4])
+
+        offset = self._position - first_group * 3
+        data = window[offset : offset + length]
+        if len(data) != length:
+            raise ValueError("Invalid input: Base64 data must not contain whitespace")
+
+        buffer[:length] = data
+        self._position += length
+        return length
+
+
 def input_to_file(
-    input_file: str, get_file_extension: bool = False, metadata: bool = False
-) -> Union[io.BytesIO, Tuple[io.BytesIO, str]]:
+    input_file: str,
+    get_file_extension: bool = False,
+    metadata: bool = False,
+    lazy: bool = False,
+    sniff: bool = False,
+) -> Union[io.BytesIO, Base64Reader, Tuple[Union[io.BytesIO, Base64Reader], str]]:
     """
     >>> input_to_file(
         input_file: str,
-        get_file_extension: bool = False
-    ) -> Union[io.BytesIO, Tuple[io.BytesIO, str]]
+        get_file_extension: bool = False,
+        lazy: bool = False,
+        sniff: bool = False
+    ) -> Union[io.BytesIO, Base64Reader, Tuple[Union[io.BytesIO, Base64Reader], str]]
 
     Transforms a Base64 encoded string into a file object. Optionally, returns the file extension.
 
@@ -30,12 +256,18 @@ def input_to_file(
         A Base64 encoded string prefixed with file_extension.
     get_file_extension : bool, optional
         If set to True, the function also returns the file_extension. Defaults to `False`.
+    lazy : bool, optional
+        If set to True, returns a `Base64Reader` that decodes the file data as it is read instead of an `io.BytesIO`.
+        Useful for large files that are read sequentially. Defaults to `False`.
+    sniff : bool, optional
+        If set to True, the file extension is detected from the first bytes of the file data instead of the MIME type
+        (the MIME type is only used if the file type can't be detected). Defaults to `False`.
 
     Returns
     -------
-    * `Union[io.BytesIO, Tuple[io.BytesIO, str]]` :
-        * If `get_file_extension` is False, returns an `io.BytesIO` object containing the decoded file data.
-        * If `get_file_extension` is True, returns a tuple containing the `io.BytesIO` object and a `string` representing the file_extension.
+    * `Union[io.BytesIO, Base64Reader, Tuple[Union[io.BytesIO, Base64Reader], str]]` :
+        * If `get_file_extension` is False, returns an `io.BytesIO` object containing the decoded file data (or a `Base64Reader` if `lazy` is True).
+        * If `get_file_extension` is True, returns a tuple containing the file object and a `string` representing the file_extension.
 
     Raises
     ------
@@ -46,6 +278,8 @@ def input_to_file(
     -----
     The file object is an open file and can be used with Python file functions like open_file.read()
 
+    If the decode cache is enabled (see `enable_decode_cache`), inputs that were already decoded are not decoded again.
+
     Examples
     --------
     **Without file extension**:
@@ -58,17 +292,17 @@ def input_to_file(
     >>> input_file = inputs["input_file"]
     >>> open_file, get_file_extension = msc.input_to_file(input_file, file_extension=True)
     """
-    # Check if the input string contains ';base64,' which is required to separate metadata and file data
-    if ";base64," not in input_file:
-        raise ValueError("Invalid input: must contain ';base64,'")
-    
-    # Split metadata and data
-    meta, data = input_file.split(";base64,")
-    file_data = io.BytesIO(base64.b64decode(data))
-    meta_data = f"{meta};base64,"
-    
-    extension = guess_extension(guess_type(meta_data)[0])
-    extension = EXTENSION_MAP.get(extension, extension) # Only necessary for python 3.6
+    # Split metadata and data (raises ValueError if the input doesn't contain ';base64,')
+    if lazy:
+        file_data = Base64Reader(input_file)
+        meta_data = file_data.metadata
+    else:
+        meta_data, data_start = _split_metadata(input_file)
+        file_data = _decode_cached(input_file, data_start)
+
+    extension = mime_type_to_extension(_metadata_to_mime_type(meta_data))
+    if sniff:
+        extension = sniff_extension(file_data, default=extension)
     
     # Deprecated
     if metadata:
@@ -76,6 +310,79 @@ def input_to_file(
     
     return (file_data, extension) if get_file_extension else file_data
 
+
+def inputs_to_files(
+    input_files: Union[Mapping[str, str], Sequence[str]],
+    get_file_extension: bool = False,
+    max_workers: Optional[int] = None,
+    serial_threshold: Optional[float] = None,
+) -> Union[Dict[str, Union[io.BytesIO, Tuple[io.BytesIO, str]]], List[Union[io.BytesIO, Tuple[io.BytesIO, str]]]]:
+    """
+    >>> inputs_to_files(
+        input_files: Union[Mapping[str, str], Sequence[str]],
+        get_file_extension: bool = False,
+        max_workers: Optional[int] = None,
+        serial_threshold: Optional[float] = None
+    ) -> Union[Dict[str, Union[io.BytesIO, Tuple[io.BytesIO, str]]], List[Union[io.BytesIO, Tuple[io.BytesIO, str]]]]
+
+    Transforms many Base64 encoded strings into file objects at once. On free-threaded Python builds, large batches
+    are decoded on a thread pool.
+
+    Parameters
+    ----------
+    input_files : Union[Mapping[str, str], Sequence[str]]
+        A dictionary or list of Base64 encoded strings prefixed with their metadata.
+    get_file_extension : bool, optional
+        If set to True, each file object is returned together with its file extension. Defaults to `False`.
+    max_workers : int, optional
+        The maximum number of threads used for decoding. Defaults to the number of CPUs.
+    serial_threshold : float, optional
+        If the inputs contain fewer Base64 characters than this in total, they are decoded one after another
+        without a thread pool. Defaults to `None`: `PARALLEL_DECODE_THRESHOLD` (16 MB) on free-threaded builds,
+        otherwise the inputs are always decoded serially.
+
+    Notes
+    -----
+    On regular (GIL) CPython builds, Base64 decoding holds the GIL, so a thread pool decodes no faster than a loop.
+    It only speeds up decoding on free-threaded builds (e.g., python3.13t), which is why it is off by default otherwise.
+
+    Returns
+    -------
+    * `Union[Dict[str, Union[io.BytesIO, Tuple[io.BytesIO, str]]], List[Union[io.BytesIO, Tuple[io.BytesIO, str]]]]` :
+        * If `input_files` is a dictionary, returns a dictionary with the same keys and the results of `input_to_file` as values.
+        * Otherwise, returns a list with the results of `input_to_file` in the same order as `input_files`.
+
+    Raises
+    ------
+    * `ValueError` :
+        If any input string does not contain ";base64,".
+
+    Examples
+    --------
+    >>> files = msc.inputs_to_files({"table": inputs["table_file"], "photo": inputs["photo_file"]})
+    >>> table_file = files["table"]
+
+    >>> files = msc.inputs_to_files(inputs["files"], get_file_extension=True)
+    >>> for file, file_extension in files:
+    ...     print(file_extension)
+    """
+    is_mapping = isinstance(input_files, Mapping)
+    values = list(input_files.values()) if is_mapping else list(input_files)
+    decode = partial(input_to_file, get_file_extension=get_file_extension)
+
+    if serial_threshold is None:
+        serial_threshold = PARALLEL_DECODE_THRESHOLD if not _gil_enabled() else float("inf")
+
+    workers = min(len(values), max_workers or os.cpu_count() or 1)
+    if workers <= 1 or sum(map(len, values)) < serial_threshold:
+        results = [decode(value) for value in values]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(decode, values))
+
+    return dict(zip(input_files.keys(), results)) if is_mapping else results
+
+
 # Deprecated
 def metadata_to_filetype(metadata: str) -> str:
     """
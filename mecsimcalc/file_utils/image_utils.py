@@ -1,16 +1,48 @@
 import base64
 import io
-from typing import Union, Tuple
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Union, Tuple, Optional, Dict, List, Mapping, Sequence
 from mimetypes import guess_type
 
 from PIL import Image
 
-from mecsimcalc import input_to_file
+from mecsimcalc.file_utils.general_utils import _split_metadata, _decode_input
+from mecsimcalc.file_utils.cache_utils import get_decode_cache, payload_digest, cache_key
 
 
-def file_to_PIL(file: io.BytesIO) -> Image.Image:
+# Image modes Image.reduce can shrink: it fails on "1", "P" and 16-bit modes and averages palette indices of "PA"
+REDUCE_MODES = ("L", "LA", "La", "RGB", "RGBA", "RGBa", "RGBX", "CMYK", "YCbCr", "LAB", "HSV", "I", "F")
+
+
+def _reduce_on_load(image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """
+    Decodes image at close to (but not smaller than) size. JPEGs are decoded at 1/2, 1/4 or 1/8 scale by the
+    decoder itself (draft mode). Other formats can't be decoded at a lower scale, so they are shrunk by a whole
+    factor with `Image.reduce` right after decoding, which is much faster than resampling.
+    """
+    if image.format == "JPEG":
+        image.draft(image.mode, size)
+        return image
+
+    # animated images would lose their other frames, other modes (e.g., palette GIFs and PNGs) are decoded in full
+    if getattr(image, "n_frames", 1) > 1 or image.mode not in REDUCE_MODES:
+        return image
+
+    factor = min(image.width // size[0], image.height // size[1])
+    if factor < 2:
+        return image
+
+    reduced = image.reduce(factor)
+    reduced.format = image.format
+    return reduced
+
+
+def file_to_PIL(file: io.BytesIO, size: Optional[Tuple[int, int]] = None) -> Image.Image:
     """
-    >>> file_to_PIL(file: io.BytesIO) -> Image.Image
+    >>> file_to_PIL(file: io.BytesIO, size: Optional[Tuple[int, int]] = None) -> Image.Image
 
     Converts a binary file object into a PIL Image object.
 
@@ -18,6 +50,9 @@ def file_to_PIL(file: io.BytesIO) -> Image.Image:
     ----------
     file : io.BytesIO
         A binary file object containing image data.
+    size : Tuple[int, int], optional
+        If set, the image is decoded at close to (but not smaller than) this (width, height) instead of at full
+        resolution, e.g., for previews shown with `print_image`. The aspect ratio is kept. Defaults to `None`.
 
     Returns
     ----------
@@ -38,18 +73,158 @@ def file_to_PIL(file: io.BytesIO) -> Image.Image:
     (image is now ready to be used with Pillow functions)
     """
     try:
-        return Image.open(file)
+        image = Image.open(file)
     except IOError as e:
         raise ValueError("Invalid file object. It does not contain image data.") from e
 
+    return image if size is None else _reduce_on_load(image, size)
+
+
+def _copy_image(image: Image.Image) -> Image.Image:
+    """Copies an image, keeping its format (Image.copy drops it)."""
+    image_copy = image.copy()
+    image_copy.format = image.format
+    return image_copy
+
+
+def _track_input(image: Image.Image, input_file: str, file_extension: str) -> Image.Image:
+    """Remembers the Base64 input an image was decoded from, so print_image can offer it for download as is."""
+    image._mecsimcalc_input = (input_file, file_extension)
+    return image
+
+
+def _original_download(image: Image.Image) -> Optional[Tuple[str, str]]:
+    """Returns the data URL and file extension of the input image was decoded from, if it's known."""
+    tracked = getattr(image, "_mecsimcalc_input", None)
+    if tracked is None:
+        return None
+
+    input_file, file_extension = tracked
+    if input_file.startswith("data:"):
+        return input_file, file_extension
+
+    # not a data URL yet (e.g., "image/png;base64,..."), only the prefix is replaced
+    _, data_start = _split_metadata(input_file)
+    mime_type, _ = guess_type(f"dummy{file_extension}")
+    return f"data:{mime_type or 'application/octet-stream'};base64,{input_file[data_start:]}", file_extension
+
+
+def _image_size(image: Image.Image) -> int:
+    """Estimates the memory used by an image's pixel data in bytes."""
+    return image.width * image.height * len(image.getbands())
+
+
+# print_image output formats, in the order "auto" tries them (the image's own format is tried too, if it has one)
+OUTPUT_FORMATS = ("WEBP", "AVIF", "JPEG", "PNG")
+
+# Below this many images, print_images works serially (starting worker processes costs more than it saves)
+PARALLEL_IMAGE_THRESHOLD = 4
+
+# Image modes each output format can store, other modes are converted (JPEG has no transparency)
+JPEG_MODES = ("RGB", "L", "CMYK")
+
+
+@lru_cache(maxsize=None)
+def available_image_formats() -> Tuple[str, ...]:
+    """
+    >>> available_image_formats() -> Tuple[str, ...]
+
+    Returns the `output_format` values of `print_image` that the installed Pillow can encode (WebP and AVIF
+    depend on how Pillow was built).
+
+    Examples
+    --------
+    >>> print(msc.available_image_formats())
+    ('WEBP', 'AVIF', 'JPEG', 'PNG')
+    """
+    Image.init()
+    return tuple(file_format for file_format in OUTPUT_FORMATS if file_format in Image.SAVE)
+
+
+def _mime_type(file_format: str) -> Optional[str]:
+    mime_type, _ = guess_type(f"dummy.{file_format.lower()}")
+    return mime_type or Image.MIME.get(file_format.upper())
+
+
+def _has_transparency(image: Image.Image) -> bool:
+    """Returns True if image has an alpha band or a transparent (palette) color."""
+    return "A" in image.getbands() or "transparency" in image.info
+
+
+def _encode_image(image: Image.Image, file_format: str, quality: Optional[int]) -> bytes:
+    """Encodes image in file_format, converting its mode if the format can't store it."""
+    if file_format == "JPEG" and image.mode not in JPEG_MODES:
+        image = image.convert("RGB")
+
+    options = {} if quality is None else {"quality": quality}
+    buffer = io.BytesIO()
+    image.save(buffer, format=file_format, **options)
+    return buffer.getvalue()
+
+
+def _smallest_encoding(image: Image.Image, file_formats: Tuple[str, ...], quality: Optional[int]) -> Tuple[str, bytes]:
+    """Encodes image in each of file_formats and returns the smallest (format, data)."""
+    encodings = []
+    for file_format in file_formats:
+        try:
+            encodings.append((file_format, _encode_image(image, file_format, quality)))
+        except (OSError, ValueError, KeyError):
+            # e.g., the image's own format can't be written by Pillow
+            continue
+    return min(encodings, key=lambda encoding: len(encoding[1]))
+
+
+# id(image) -> {preview options: HTML image}, filled by print_image(cache_preview=True)
+_preview_cache: Dict[int, Dict[Tuple, str]] = {}
+
+
+def _cached_previews(image: Image.Image) -> Dict[Tuple, str]:
+    """Returns the HTML images already made for image, they are freed when image is garbage collected."""
+    previews = _preview_cache.get(id(image))
+    if previews is None:
+        previews = _preview_cache[id(image)] = {}
+        weakref.finalize(image, _preview_cache.pop, id(image), None)
+    return previews
+
+
+def _thumbnail(
+    image: Image.Image, size: Tuple[int, int], resample: int, reducing_gap: Optional[float]
+) -> Image.Image:
+    """
+    Returns a copy of image that fits in size, keeping the aspect ratio (like `Image.thumbnail`, without changing
+    image). Images are never enlarged.
+    """
+    scale = min(size[0] / image.width, size[1] / image.height)
+    if scale >= 1:
+        return image
+
+    target = (max(round(image.width * scale), 1), max(round(image.height * scale), 1))
+    if image.mode not in REDUCE_MODES:
+        # resize's reducing_gap uses Image.reduce, which fails on e.g. 16-bit images
+        reducing_gap = None
+
+    # A JPEG that isn't decoded yet gets a second decoder on the same file data, drafted at close to the
+    # preview size, so neither the full size pixels are decoded nor image is drafted
+    source = image
+    file = getattr(image, "fp", None)
+    if image.format == "JPEG" and getattr(image, "tile", None) and reducing_gap is not None and isinstance(file, io.BytesIO):
+        source = Image.open(io.BytesIO(file.getvalue()))
+        source.draft(image.mode, (int(target[0] * reducing_gap), int(target[1] * reducing_gap)))
+
+    return source.resize(target, resample, reducing_gap=reducing_gap)
+
 
 def input_to_PIL(
-    input_file: str, get_file_extension: bool = False, get_file_type: bool = False
+    input_file: str,
+    get_file_extension: bool = False,
+    get_file_type: bool = False,
+    size: Optional[Tuple[int, int]] = None,
 ) -> Union[Image.Image, Tuple[Image.Image, str]]:
     """
     >>> input_to_PIL(
         input_file: str,
-        get_file_extension: bool = False
+        get_file_extension: bool = False,
+        size: Optional[Tuple[int, int]] = None
     ) -> Union[Image.Image, Tuple[Image.Image, str]]
 
     Decodes a Base64 encoded string into a PIL Image object. Optionally, the file extension can also be returned.
@@ -60,6 +235,10 @@ def input_to_PIL(
         A Base64 encoded string containing image data.
     get_file_extension : bool, optional
         If set to True, the function also returns the file extension of the image. Defaults to `False`.
+    size : Tuple[int, int], optional
+        If set, the image is decoded at close to (but not smaller than) this (width, height) instead of at full
+        resolution. JPEGs are decoded at a lower scale directly, which is much faster and uses much less memory.
+        Use it when the image is only shown as a preview. Defaults to `None`.
 
     Returns
     -------
@@ -83,19 +262,44 @@ def input_to_PIL(
     '.png'
 
     (image is now ready to be used with Pillow functions)
+
+    **Decoded at preview size**:
+
+    >>> image = msc.input_to_PIL(input_file, size=(200, 200))
+    >>> html_image = msc.print_image(image, width=200, height=200)
+
+    Notes
+    -----
+    If the decode cache is enabled (see `enable_decode_cache`), a copy of the cached image is returned for inputs that were already decoded.
+
+    The image remembers the input it was decoded from, so `print_image(image, download=True, download_original=True)`
+    can link to the uploaded file without encoding the image again.
     """
     # get_file_type is deprecated
     get_file_extension = get_file_extension or get_file_type
-    
-    # Get file extension from metadata
-    file_data = input_to_file(input_file)
-    image = file_to_PIL(file_data)
-    
-    if get_file_extension:
-        file_data, file_extension = input_to_file(input_file, get_file_extension=True)
-        return image, file_extension
-    
-    return image
+
+    # reuse the decoded image if this input was already converted
+    cache = get_decode_cache()
+    digest = None
+    if cache is not None:
+        digest = payload_digest(input_file)
+        key = cache_key("image", digest, size)
+        cached = cache.get(key)
+        if cached is not None:
+            image, file_extension = cached
+            image = _track_input(_copy_image(image), input_file, file_extension)
+            return (image, file_extension) if get_file_extension else image
+
+    # Decode once, the file extension comes from the same call
+    file_data, file_extension = _decode_input(input_file, digest=digest)
+    image = _track_input(file_to_PIL(file_data, size), input_file, file_extension)
+
+    # animated images can't be cached, copies only keep the current frame
+    if cache is not None and getattr(image, "n_frames", 1) == 1:
+        image.load()
+        cache.put(key, (_copy_image(image), file_extension), _image_size(image))
+
+    return (image, file_extension) if get_file_extension else image
 
 
 def print_image(
@@ -107,6 +311,12 @@ def print_image(
     download_text: str = "Download Image",
     download_file_name: str = "myimg",
     download_file_type: str = None,
+    download_original: bool = False,
+    resample: int = Image.BICUBIC,
+    reducing_gap: Optional[float] = 2.0,
+    cache_preview: bool = False,
+    output_format: Optional[str] = None,
+    quality: Optional[int] = None,
 ) -> Union[str, Tuple[str, str]]:
     """
     >>> print_image(
@@ -117,9 +327,16 @@ def print_image(
         download: bool = False,
         download_text: str = "Download Image",
         download_file_name: str = "myimg",
+        download_original: bool = False,
+        resample: int = Image.BICUBIC,
+        reducing_gap: Optional[float] = 2.0,
+        cache_preview: bool = False,
+        output_format: Optional[str] = None,
+        quality: Optional[int] = None
     ) -> Union[str, Tuple[str, str]]
 
-    Transforms a Pillow image into an HTML image, with an optional download link.
+    Transforms a Pillow image into an HTML image, with an optional download link. The image itself is not changed,
+    the displayed image is a resized copy.
 
     Parameters
     ----------
@@ -133,6 +350,36 @@ def print_image(
         If True, the image will retain its original size. Defaults to `False`.
     download : bool, optional
         If True, a download link will be provided below the image. Defaults to `False`.
+    download_original : bool, optional
+        If True and the image came from `input_to_PIL`, the download link reuses the uploaded file as is instead of
+        encoding the image again. Changes made to the image afterwards are not part of the download. Images that
+        weren't created by `input_to_PIL` are encoded as usual. Defaults to `False`.
+    resample : int, optional
+        The filter used to resize the displayed image, from fastest to best quality: `Image.NEAREST`,
+        `Image.BILINEAR`, `Image.BICUBIC` or `Image.LANCZOS`. Defaults to `Image.BICUBIC`.
+    reducing_gap : float, optional
+        Large images are first shrunk by a whole factor (and JPEGs decoded at a lower scale) down to `reducing_gap`
+        times the displayed size before `resample` is applied. Smaller values are faster, `None` applies `resample`
+        to the full image (slowest, best quality). Defaults to `2.0`.
+    cache_preview : bool, optional
+        If True, the HTML image is kept for as long as the image exists, and later calls with the same image and
+        options return it without resizing or encoding again. Don't change the image in place afterwards, changes
+        are not detected. Defaults to `False`.
+    output_format : str, optional
+        The format of the displayed image: "WEBP", "AVIF", "JPEG", "PNG" (see `available_image_formats`), or "auto"
+        to encode it in each of them and the image's own format and keep the smallest (JPEG is skipped for images
+        with transparency). WebP and AVIF are usually much smaller than PNG and JPEG. "auto" encodes the image once
+        per format, which is quick for previews but slow with `original_size=True` for large photos (AVIF in
+        particular). Defaults to `None` (the image's own format, or PNG for images without one, e.g. from
+        `Image.new`).
+    quality : int, optional
+        The quality (1-100) of lossy formats (JPEG, WebP, AVIF), lower values give smaller images. With "auto", the
+        formats are compared at this quality. Defaults to `None` (Pillow's default for each format).
+
+    Raises
+    ------
+    * `ValueError` :
+        If `output_format` is not "auto" or one of `available_image_formats()`.
 
     Returns
     -------
@@ -161,34 +408,187 @@ def print_image(
         "download_link": download_link
     }
 
+    **Download the uploaded file as is** (no re-encoding, keeps its original format and metadata):
+
+    >>> image = msc.input_to_PIL(inputs["input_file"])
+    >>> html_image, download_link = msc.print_image(image, download=True, download_original=True)
+
+    **Smallest encoding** (e.g., a screenshot shown as WebP instead of PNG):
+
+    >>> html_image = msc.print_image(image, output_format="auto", quality=80)
+
+    **Fast, cached preview** (shown again later without resizing or encoding):
+
+    >>> html_image = msc.print_image(image, resample=Image.BILINEAR, reducing_gap=1.5, cache_preview=True)
+
+    **Preview of a large photo** (decoded at close to the display size, see `input_to_PIL`):
+
+    >>> image = msc.input_to_PIL(input_file, size=(200, 200))
+    >>> html_image = msc.print_image(image, width=200, height=200)
+
     """
     # download_file_type is deprecated
-    
-    # get metadata (file type) from image
-    dummy_filename = f"dummy.{image.format.lower()}"
-    mime_type, _ = guess_type(dummy_filename)
-    metadata = f"data:{mime_type};base64,"
-    
-    if download:
-        # Preserve original image if downloading
-        download_image = image.copy()
-
-        # Get download image data (Full Resolution Image)
+
+    if output_format is not None:
+        output_format = "JPEG" if output_format.upper() == "JPG" else output_format.upper()
+        if output_format != "AUTO" and output_format not in available_image_formats():
+            raise ValueError(
+                f"Unsupported output_format {output_format!r}, use 'auto' or one of {available_image_formats()}"
+            )
+
+
+    original = _original_download(image) if download and download_original else None
+    if original is not None:
+        # the uploaded file is linked as is: no decode, copy or re-encode
+        encoded_data, file_extension = original
+        download_file = f"{download_file_name}{file_extension}"
+    elif download:
+        # Get download image data (Full Resolution Image), saving doesn't change the image so no copy is needed
+        # images made in code (e.g., Image.new) have no format and are downloaded as PNG
+        download_format = image.format or "PNG"
         download_buffer = io.BytesIO()
-        download_image.save(download_buffer, format=image.format)
+        image.save(download_buffer, format=download_format)
+        metadata = f"data:{_mime_type(download_format)};base64,"
         encoded_data = f"{metadata}{base64.b64encode(download_buffer.getvalue()).decode()}"
-
-    if not original_size:
-        image.thumbnail((width, height))
-
-    # Convert image to image tag (HTML)
-    buffer = io.BytesIO()
-    image.save(buffer, format=image.format)
-    encoded_display_data = (metadata + base64.b64encode(buffer.getvalue()).decode())
-    image_tag = f"<img src='{encoded_display_data}'>"
-
+        download_file = f"{download_file_name}.{download_format.lower()}"
+
+    # the same image is often shown more than once (e.g., in a loop or on several pages)
+    previews = _cached_previews(image) if cache_preview else {}
+    preview_key = (original_size, width, height, resample, reducing_gap, output_format, quality)
+    image_tag = previews.get(preview_key)
+    if image_tag is None:
+        preview = image if original_size else _thumbnail(image, (width, height), resample, reducing_gap)
+
+        # Convert image to image tag (HTML)
+        if output_format == "AUTO":
+            own_format = (image.format,) if image.format else ()
+            file_formats = tuple(dict.fromkeys(available_image_formats() + own_format))
+            if _has_transparency(image):
+                # JPEG would flatten the transparency
+                file_formats = tuple(file_format for file_format in file_formats if file_format != "JPEG")
+            file_format, data = _smallest_encoding(preview, file_formats, quality)
+        else:
+            file_format = output_format or image.format or "PNG"
+            data = _encode_image(preview, file_format, quality)
+        image_tag = f"<img src='data:{_mime_type(file_format)};base64,{base64.b64encode(data).decode()}'>"
+        previews[preview_key] = image_tag
 
     if not download:
         return image_tag
-    download_link = f"<a href='{encoded_data}' download='{download_file_name}.{(image.format or 'png').lower()}'>{download_text}</a>"
+    download_link = f"<a href='{encoded_data}' download='{download_file}'>{download_text}</a>"
     return image_tag, download_link
+
+
+def _print_input_image(input_file: str, width: int, height: int, original_size: bool, **options) -> str:
+    """Decodes a Base64 input and returns its HTML image (runs in print_images' worker processes)."""
+    reducing_gap = options.get("reducing_gap", 2.0)
+    size = None if original_size or reducing_gap is None else (int(width * reducing_gap), int(height * reducing_gap))
+    image = input_to_PIL(input_file, size=size)
+    return print_image(image, width=width, height=height, original_size=original_size, **options)
+
+
+def print_images(
+    input_files: Union[Mapping[str, str], Sequence[str]],
+    width: int = 200,
+    height: int = 200,
+    original_size: bool = False,
+    resample: int = Image.BICUBIC,
+    reducing_gap: Optional[float] = 2.0,
+    output_format: Optional[str] = None,
+    quality: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    serial_threshold: int = PARALLEL_IMAGE_THRESHOLD,
+) -> Union[Dict[str, str], List[str]]:
+    """
+    >>> print_images(
+        input_files: Union[Mapping[str, str], Sequence[str]],
+        width: int = 200,
+        height: int = 200,
+        original_size: bool = False,
+        resample: int = Image.BICUBIC,
+        reducing_gap: Optional[float] = 2.0,
+        output_format: Optional[str] = None,
+        quality: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        serial_threshold: int = PARALLEL_IMAGE_THRESHOLD
+    ) -> Union[Dict[str, str], List[str]]
+
+    Transforms many Base64 encoded images into HTML images at once. The images are decoded, resized and encoded
+    on a pool of worker processes, so a batch uses every CPU instead of one.
+
+    Parameters
+    ----------
+    input_files : Union[Mapping[str, str], Sequence[str]]
+        A dictionary or list of Base64 encoded images prefixed with their metadata.
+    width : int, optional
+        The width for the displayed images, in pixels. Defaults to `200`.
+    height : int, optional
+        The height for the displayed images, in pixels. Defaults to `200`.
+    original_size : bool, optional
+        If True, the images will retain their original size. Defaults to `False`.
+    resample : int, optional
+        The filter used to resize the images (see `print_image`). Defaults to `Image.BICUBIC`.
+    reducing_gap : float, optional
+        Shrinks large images by a whole factor first (see `print_image`). Defaults to `2.0`.
+    output_format : str, optional
+        The format of the displayed images (see `print_image`). Defaults to `None` (each image's own format).
+    quality : int, optional
+        The quality (1-100) of lossy formats (see `print_image`). Defaults to `None`.
+    max_workers : int, optional
+        The maximum number of worker processes. Defaults to the number of CPUs.
+    serial_threshold : int, optional
+        If there are fewer images than this, they are processed one after another without worker processes.
+        Defaults to `PARALLEL_IMAGE_THRESHOLD` (4).
+
+    Returns
+    -------
+    * `Union[Dict[str, str], List[str]]` :
+        * If `input_files` is a dictionary, returns a dictionary with the same keys and HTML images as values.
+        * Otherwise, returns a list of HTML images in the same order as `input_files`.
+
+    Raises
+    ------
+    * `ValueError` :
+        If any input is not a Base64 encoded image, or `output_format` is not supported.
+
+    Examples
+    --------
+    >>> html_images = msc.print_images(inputs["photos"], width=300, height=300, output_format="webp")
+    >>> return {
+        "html_images": "".join(html_images)
+    }
+
+    Notes
+    -----
+    Use `print_image` for download links. Where worker processes can't be started, the images are processed
+    serially.
+    """
+    is_mapping = isinstance(input_files, Mapping)
+    values = list(input_files.values()) if is_mapping else list(input_files)
+    convert = partial(
+        _print_input_image,
+        width=width,
+        height=height,
+        original_size=original_size,
+        resample=resample,
+        reducing_gap=reducing_gap,
+        output_format=output_format,
+        quality=quality,
+    )
+
+    workers = min(len(values), max_workers or os.cpu_count() or 1)
+    executor = None
+    if workers > 1 and len(values) >= serial_threshold:
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, ImportError, NotImplementedError):
+            # no multiprocessing support (e.g., no /dev/shm in some sandboxes)
+            executor = None
+
+    if executor is None:
+        results = [convert(value) for value in values]
+    else:
+        with executor:
+            results = list(executor.map(convert, values))
+
+    return dict(zip(input_files.keys(), results)) if is_mapping else results
@@ -0,0 +1,113 @@
+import codecs
+import zipfile
+from typing import BinaryIO, Optional
+
+# Number of bytes read from the start of a file to detect its type
+SNIFF_LENGTH = 2048
+
+# (offset, signature, extension) for file types that can be identified from their first bytes
+MAGIC_NUMBERS = [
+    (0, b"\x89PNG\r\n\x1a\n", ".png"),
+    (0, b"\xff\xd8\xff", ".jpg"),
+    (0, b"GIF87a", ".gif"),
+    (0, b"GIF89a", ".gif"),
+    (0, b"%PDF-", ".pdf"),
+    (0, b"II*\x00", ".tiff"),
+    (0, b"MM\x00*", ".tiff"),
+    (8, b"WEBP", ".webp"),
+    (4, b"ftypavif", ".avif"),
+    (4, b"ftypheic", ".heic"),
+    (4, b"ftypmif1", ".heic"),
+    (4, b"ftyp", ".mp4"),
+    # Microsoft Office 97-2003 files (OLE compound documents)
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", ".xls"),
+]
+
+ZIP_SIGNATURE = b"PK\x03\x04"
+
+# Extensions of text files. If a file sniffs as text, these extensions (from the MIME type) are kept
+TEXT_EXTENSIONS = {".txt", ".csv", ".tsv", ".html", ".htm", ".json", ".xml", ".svg", ".md"}
+
+
+def _sniff_zip(file: BinaryIO) -> str:
+    """Tells the office formats (which are ZIP archives) apart by their contents."""
+    try:
+        names = set(zipfile.ZipFile(file).namelist())
+    except zipfile.BadZipFile:
+        return ".zip"
+
+    if "xl/workbook.xml" in names or "xl/workbook.bin" in names:
+        return ".xlsb" if "xl/workbook.bin" in names else ".xlsx"
+    if "word/document.xml" in names:
+        return ".docx"
+    if "ppt/presentation.xml" in names:
+        return ".pptx"
+    if "content.xml" in names and "mimetype" in names:
+        return ".ods"
+    return ".zip"
+
+
+def _is_text(head: bytes) -> bool:
+    """Checks if the start of a file is UTF-8 or UTF-16 text."""
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return True
+    if b"\x00" in head:
+        return False
+
+    try:
+        # final=False ignores a multi-byte character cut off at the end of head
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def sniff_extension(file: BinaryIO, default: Optional[str] = None) -> Optional[str]:
+    """
+    >>> sniff_extension(file: BinaryIO, default: Optional[str] = None) -> Optional[str]
+
+    Detects the type of a file from its first bytes ("magic numbers") instead of trusting its MIME type.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        A seekable binary file object (e.g., the result of `input_to_file`). Its position is left unchanged.
+    default : str, optional
+        The extension to return if the file type can't be detected (usually the extension from the MIME type).
+        Text files keep this extension if it is a text extension (e.g., ".csv"). Defaults to `None`.
+
+    Returns
+    -------
+    * `Optional[str]` :
+        The detected file extension (e.g., ".xlsx", ".png", ".txt"), or `default` if the type can't be detected.
+
+    Examples
+    --------
+    >>> file = msc.input_to_file(inputs["input_file"])
+    >>> print(msc.sniff_extension(file))
+    '.xlsx'
+    """
+    position = file.tell()
+    head = file.read(SNIFF_LENGTH)
+    file.seek(position)
+
+    if not head:
+        return default
+
+    for offset, signature, extension in MAGIC_NUMBERS:
+        if head.startswith(signature, offset):
+            return extension
+
+    # "BM" alone is too common at the start of text files, so also check the reserved (zero) header bytes
+    if head.startswith(b"BM") and head[6:10] == b"\x00\x00\x00\x00":
+        return ".bmp"
+
+    if head.startswith(ZIP_SIGNATURE):
+        extension = _sniff_zip(file)
+        file.seek(position)
+        return extension
+
+    if _is_text(head):
+        return default if default in TEXT_EXTENSIONS else ".txt"
+
+    return default
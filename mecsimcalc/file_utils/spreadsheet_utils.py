@@ -1,14 +1,187 @@
 import io
 import base64
+import binascii
+import gzip
+import hashlib
+import weakref
+from html import escape
+from functools import lru_cache
+from importlib.util import find_spec
+from itertools import islice
+from xml.etree import ElementTree
+import zipfile
+import numpy as np
 import pandas as pd
-from typing import Union, Tuple
+from typing import Union, Tuple, Optional, Iterator, Callable, Any, Dict, List, BinaryIO
 
 from mecsimcalc import input_to_file
+from mecsimcalc.file_utils.general_utils import _decode_input
+from mecsimcalc.file_utils.cache_utils import get_decode_cache, payload_digest, cache_key
+from mecsimcalc.file_utils.sniff_utils import sniff_extension
 
+# file extension -> keyword arguments for pd.read_csv
+CSV_FORMATS = {
+    ".csv": {},
+    ".txt": {},
+    ".tsv": {"sep": "\t"},
+}
 
-def file_to_dataframe(file: io.BytesIO) -> pd.DataFrame:
+# pd.read_csv engines, fastest first
+CSV_ENGINES = ("pyarrow", "c", "python")
+
+# Files smaller than this are parsed with the "c" engine even if pyarrow is installed
+# (pyarrow's setup costs more than it saves on small files)
+PYARROW_MIN_SIZE = 256 * 1024
+
+# file extension -> pd.read_excel engine
+EXCEL_FORMATS = {
+    ".xlsx": "openpyxl",  # engine="openpyxl" is necessary for python 3.6
+    ".xlsm": "openpyxl",
+    ".xls": "xlrd",
+    ".xlsb": "pyxlsb",
+    ".ods": "odf",
+}
+
+
+def _normalize_file_type(file_type: Optional[str]) -> Optional[str]:
+    """Turns "csv", ".CSV", "excel", etc. into a file extension like ".csv"."""
+    if not file_type:
+        return None
+    file_type = "." + file_type.lower().strip().lstrip(".")
+    return ".xlsx" if file_type == ".excel" else file_type
+
+
+def compact_dataframe(
+    df: pd.DataFrame, category_threshold: float = 0.5, exclude: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    >>> compact_dataframe(
+        df: pd.DataFrame,
+        category_threshold: float = 0.5,
+        exclude: Optional[List[str]] = None
+    ) -> pd.DataFrame
+
+    Reduces the memory used by a DataFrame. Integer columns are downcast to the smallest integer type that fits,
+    float columns to float32 if that doesn't lose precision, and text columns with few unique values to `category`.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame to compact (it is not modified).
+    category_threshold : float, optional
+        Text columns are converted to `category` if their number of unique values is at most this fraction of
+        their length. Defaults to `0.5`.
+    exclude : List[str], optional
+        Columns to leave unchanged. Defaults to `None`.
+
+    Returns
+    -------
+    * `pd.DataFrame` :
+        A compacted copy of the DataFrame.
+
+    Examples
+    --------
+    >>> df = msc.compact_dataframe(df)
+    >>> print(df.dtypes)
+    A       int8
+    B    float32
+    C   category
+    """
+    exclude = set(exclude or [])
+    columns = {}
+    for position, (name, column) in enumerate(df.items()):
+        if name in exclude or pd.api.types.is_bool_dtype(column):
+            continue
+
+        if pd.api.types.is_integer_dtype(column):
+            downcast = "unsigned" if len(column) and column.min() >= 0 else "integer"
+            columns[position] = pd.to_numeric(column, downcast=downcast)
+        elif pd.api.types.is_float_dtype(column):
+            values = column.to_numpy()
+            compact_values = values.astype(np.float32)
+            if np.array_equal(compact_values, values, equal_nan=True):
+                columns[position] = pd.Series(compact_values, index=column.index, name=name)
+        elif pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column):
+            if len(column) and column.nunique() <= category_threshold * len(column):
+                columns[position] = column.astype("category")
+
+    if not columns:
+        return df.copy()
+
+    # columns are replaced by position, so duplicate column names are handled too
+    compacted = pd.concat([columns.get(i, df.iloc[:, i]) for i in range(df.shape[1])], axis=1)
+    compacted.columns = df.columns
+    return compacted
+
+
+@lru_cache(maxsize=None)
+def available_csv_engines() -> Tuple[str, ...]:
+    """
+    >>> available_csv_engines() -> Tuple[str, ...]
+
+    Returns the `pd.read_csv` engines that can be used in this environment, fastest first.
+
+    Examples
+    --------
+    >>> print(msc.available_csv_engines())
+    ('pyarrow', 'c', 'python')
     """
-    >>> file_to_dataframe(file: io.BytesIO) -> pd.DataFrame
+    pandas_version = tuple(int(part) for part in pd.__version__.split(".")[:2])
+
+    # engine="pyarrow" was added in pandas 1.4
+    if pandas_version >= (1, 4) and find_spec("pyarrow") is not None:
+        return CSV_ENGINES
+    return CSV_ENGINES[1:]
+
+
+def _file_size(file: io.BytesIO) -> int:
+    position = file.tell()
+    size = file.seek(0, io.SEEK_END)
+    file.seek(position)
+    return size
+
+
+def _read_csv(file: io.BytesIO, engine: str = "c", **options) -> pd.DataFrame:
+    """pd.read_csv with engine selection. "auto" uses pyarrow for large files and falls back to "c" if it fails."""
+    if engine != "auto":
+        return pd.read_csv(file, engine=engine, **options)
+
+    if "pyarrow" in available_csv_engines() and _file_size(file) >= PYARROW_MIN_SIZE:
+        position = file.tell()
+        try:
+            return pd.read_csv(file, engine="pyarrow", **options)
+        except Exception:
+            # pyarrow doesn't support every option/file pandas does
+            file.seek(position)
+
+    return pd.read_csv(file, engine="c", **options)
+
+
+def _read_options(dtype, usecols, parse_dates) -> Dict[str, Any]:
+    """Keyword arguments for pd.read_csv/pd.read_excel (only the ones that were given)."""
+    options = {"dtype": dtype, "usecols": usecols, "parse_dates": parse_dates}
+    return {name: value for name, value in options.items() if value is not None}
+
+
+def file_to_dataframe(
+    file: io.BytesIO,
+    file_type: Optional[str] = None,
+    dtype: Optional[Union[str, Dict[str, Any]]] = None,
+    usecols: Optional[List[Union[str, int]]] = None,
+    parse_dates: Optional[Union[bool, List[str]]] = None,
+    compact: bool = False,
+    engine: str = "c",
+) -> pd.DataFrame:
+    """
+    >>> file_to_dataframe(
+        file: io.BytesIO,
+        file_type: Optional[str] = None,
+        dtype: Optional[Union[str, Dict[str, Any]]] = None,
+        usecols: Optional[List[Union[str, int]]] = None,
+        parse_dates: Optional[Union[bool, List[str]]] = None,
+        compact: bool = False,
+        engine: str = "c"
+    ) -> pd.DataFrame
 
     Converts base64 encoded file data into a pandas DataFrame.
 
@@ -16,6 +189,24 @@ def file_to_dataframe(file: io.BytesIO) -> pd.DataFrame:
     ----------
     file : io.BytesIO
         Decoded file data as an io.BytesIO object.
+    file_type : str, optional
+        The file type (e.g., "csv", ".xlsx"). If not given, the file type is detected from the file's first bytes.
+        Defaults to `None`.
+    dtype : Union[str, Dict[str, Any]], optional
+        The data type for all columns, or a dictionary of column name -> data type (e.g., `{"A": "float32"}`).
+        Skips pandas' type inference for these columns. Defaults to `None`.
+    usecols : List[Union[str, int]], optional
+        Only these columns (names or positions) are read. Defaults to `None` (all columns).
+    parse_dates : Union[bool, List[str]], optional
+        Columns to parse as dates. Defaults to `None`.
+    compact : bool, optional
+        If True, the DataFrame is passed through `compact_dataframe` (columns given in `dtype` are left unchanged).
+        Defaults to `False`.
+    engine : str, optional
+        The `pd.read_csv` engine for text files: "pyarrow", "c", "python" or "auto". "auto" uses pyarrow
+        (multithreaded) for files over 256 KB if it is installed, and the "c" engine otherwise or if pyarrow fails.
+        pyarrow infers some types differently from the "c" engine (e.g., dates become `datetime.date` objects
+        instead of strings), so with "auto" the column types can depend on the file size. Defaults to `"c"`.
 
     Returns
     -------
@@ -26,6 +217,8 @@ def file_to_dataframe(file: io.BytesIO) -> pd.DataFrame:
     ------
     * `pd.errors.ParserError` :
         If the file type is not supported or cannot be converted into a DataFrame.
+    * `ValueError` :
+        If `engine` is not "auto" or one of the engines from `available_csv_engines()`.
 
     Examples
     --------
@@ -38,12 +231,42 @@ def file_to_dataframe(file: io.BytesIO) -> pd.DataFrame:
      1  4  5  6
     """
 
+    file_type = _normalize_file_type(file_type)
+    if file_type is None:
+        file_type = sniff_extension(file)
+
+    if engine != "auto" and engine not in available_csv_engines():
+        raise ValueError(f"Invalid engine: {engine!r} (must be 'auto' or one of {available_csv_engines()})")
+
+    options = _read_options(dtype, usecols, parse_dates)
+    df = _read_dataframe(file, file_type, options, engine)
+
+    if compact:
+        df = compact_dataframe(df, exclude=list(dtype) if isinstance(dtype, dict) else None)
+    return df
+
+
+def _read_dataframe(
+    file: io.BytesIO, file_type: Optional[str], options: Dict[str, Any], engine: str = "c"
+) -> pd.DataFrame:
+    """Parses the file with the reader for file_type (or tries csv, then excel if the file type is unknown)."""
+    # go straight to the right parser if the file type is known
+    try:
+        if file_type in CSV_FORMATS:
+            return _read_csv(file, engine, **CSV_FORMATS[file_type], **options)
+        if file_type in EXCEL_FORMATS:
+            return pd.read_excel(file, engine=EXCEL_FORMATS[file_type], **options)
+    except Exception as e:
+        raise pd.errors.ParserError("File Type Not Supported") from e
+
     # get dataframe from file data (try csv first, then excel)
+    position = file.tell()
     try:
-        df = pd.read_csv(file)
+        df = _read_csv(file, engine, **options)
     except Exception:
         try:
-            df = pd.read_excel(file, engine="openpyxl") # engine="openpyxl" is necessary for python 3.6
+            file.seek(position)
+            df = pd.read_excel(file, engine="openpyxl", **options)
         except Exception as e:
             raise pd.errors.ParserError("File Type Not Supported") from e
 
@@ -51,12 +274,26 @@ def file_to_dataframe(file: io.BytesIO) -> pd.DataFrame:
 
 
 def input_to_dataframe(
-    input_file: str, get_file_extension: bool = False, get_file_type: bool = False
+    input_file: str,
+    get_file_extension: bool = False,
+    get_file_type: bool = False,
+    file_type: Optional[str] = None,
+    dtype: Optional[Union[str, Dict[str, Any]]] = None,
+    usecols: Optional[List[Union[str, int]]] = None,
+    parse_dates: Optional[Union[bool, List[str]]] = None,
+    compact: bool = False,
+    engine: str = "c",
 ) -> Union[pd.DataFrame, Tuple[pd.DataFrame, str]]:
     """
     >>> input_to_dataframe(
         input_file: str,
-        get_file_extension: bool = False
+        get_file_extension: bool = False,
+        file_type: Optional[str] = None,
+        dtype: Optional[Union[str, Dict[str, Any]]] = None,
+        usecols: Optional[List[Union[str, int]]] = None,
+        parse_dates: Optional[Union[bool, List[str]]] = None,
+        compact: bool = False,
+        engine: str = "c"
     ) -> Union[pd.DataFrame, Tuple[pd.DataFrame, str]]
 
     Converts base64 encoded file data into a pandas DataFrame.
@@ -67,6 +304,22 @@ def input_to_dataframe(
         The base64 encoded file data.
     get_file_extension : bool, optional
         If True, the function also returns the file extension. Defaults to `False`.
+    file_type : str, optional
+        The file type (e.g., "csv", ".xlsx"). If not given, the file type is detected from the file's first bytes
+        (falling back to the MIME type). Defaults to `None`.
+    dtype : Union[str, Dict[str, Any]], optional
+        The data type for all columns, or a dictionary of column name -> data type (e.g., `{"A": "float32"}`).
+        Defaults to `None`.
+    usecols : List[Union[str, int]], optional
+        Only these columns (names or positions) are read. Defaults to `None` (all columns).
+    parse_dates : Union[bool, List[str]], optional
+        Columns to parse as dates. Defaults to `None`.
+    compact : bool, optional
+        If True, numeric columns are downcast and repetitive text columns are converted to `category`
+        (see `compact_dataframe`). Defaults to `False`.
+    engine : str, optional
+        The `pd.read_csv` engine for text files: "pyarrow", "c", "python" or "auto" (see `file_to_dataframe`).
+        Defaults to `"c"`.
 
     Returns
     -------
@@ -82,17 +335,644 @@ def input_to_dataframe(
        A  B  C
     0  1  2  3
     1  4  5  6
+
+    **With column types**:
+    >>> df = msc.input_to_dataframe(input_file, dtype={"A": "float32"}, usecols=["A", "B"], compact=True)
+
+    Notes
+    -----
+    If the decode cache is enabled (see `enable_decode_cache`), a copy of the cached DataFrame is returned for inputs that were already converted.
     """
     # get_file_type is deprecated
     get_file_extension = get_file_extension or get_file_type
-    
+
+    # reuse the parsed dataframe if this input was already converted
+    cache = get_decode_cache()
+    digest = None
+    if cache is not None:
+        digest = payload_digest(input_file)
+        key = cache_key("dataframe", digest, file_type, dtype, usecols, parse_dates, compact, engine)
+        cached = cache.get(key)
+        if cached is not None:
+            df, file_extension = cached
+            # copy so changes made by the caller don't end up in the cache
+            return (df.copy(), file_extension) if get_file_extension else df.copy()
+
     # converts input file into a dataframe
-    file_data, file_extension = input_to_file(input_file, get_file_extension=True)
+    file_data, file_extension = _decode_input(input_file, sniff=file_type is None, digest=digest)
+    df = file_to_dataframe(file_data, file_type or file_extension, dtype, usecols, parse_dates, compact, engine)
 
-    if get_file_extension:
-        return file_to_dataframe(file_data), file_extension
+    if cache is not None:
+        cache.put(key, (df.copy(), file_extension), int(df.memory_usage(deep=True).sum()))
+
+    return (df, file_extension) if get_file_extension else df
+
+
+def iter_dataframe_chunks(input_file: str, chunksize: int = 100_000, **kwargs) -> Iterator[pd.DataFrame]:
+    """
+    >>> iter_dataframe_chunks(input_file: str, chunksize: int = 100_000, **kwargs) -> Iterator[pd.DataFrame]
+
+    Reads a base64 encoded CSV file in chunks of `chunksize` rows. The file is decoded as it is read,
+    so only one chunk is held in memory at a time.
+
+    Parameters
+    ----------
+    input_file : str
+        The base64 encoded file data (a CSV or other delimited text file).
+    chunksize : int, optional
+        The number of rows in each chunk. Defaults to `100_000`.
+    **kwargs
+        Extra keyword arguments passed to `pd.read_csv` (e.g., `usecols`, `dtype`).
+
+    Returns
+    -------
+    * `Iterator[pd.DataFrame]` :
+        DataFrames with up to `chunksize` rows each, in file order.
+
+    Raises
+    ------
+    * `ValueError` :
+        If the file is not a text file (e.g., an Excel file).
+
+    Examples
+    --------
+    >>> input_file = inputs["input_file"]
+    >>> total = 0
+    >>> for chunk in msc.iter_dataframe_chunks(input_file, chunksize=10_000):
+    ...     total += chunk["A"].sum()
+    """
+    file_data, file_extension = input_to_file(input_file, get_file_extension=True, lazy=True, sniff=True)
+    if file_extension not in CSV_FORMATS:
+        raise ValueError(f"Only text files can be read in chunks (got a {file_extension} file)")
+
+    options = {**CSV_FORMATS[file_extension], **kwargs}
+    reader = pd.read_csv(file_data, chunksize=chunksize, **options)
+    try:
+        for chunk in reader:
+            yield chunk
+    finally:
+        reader.close()
+
+
+def xlsx_to_dataframe(
+    file: io.BytesIO,
+    sheet_name: Optional[Union[str, int]] = None,
+    nrows: Optional[int] = None,
+    header: bool = True,
+) -> pd.DataFrame:
+    """
+    >>> xlsx_to_dataframe(
+        file: io.BytesIO,
+        sheet_name: Optional[Union[str, int]] = None,
+        nrows: Optional[int] = None,
+        header: bool = True
+    ) -> pd.DataFrame
+
+    Reads one sheet of an Excel (.xlsx) file into a DataFrame by streaming its rows, without loading the whole
+    workbook into memory. Uses much less memory than `file_to_dataframe` for large workbooks.
+
+    Parameters
+    ----------
+    file : io.BytesIO
+        Decoded .xlsx file data (e.g., from `input_to_file`).
+    sheet_name : Union[str, int], optional
+        The name or position (starting at 0) of the sheet to read. Defaults to `None` (the first sheet).
+    nrows : int, optional
+        The maximum number of data rows to read. Defaults to `None` (all rows).
+    header : bool, optional
+        If True, the first row is used as the column names. Defaults to `True`.
+
+    Returns
+    -------
+    * `pd.DataFrame` :
+        A DataFrame with the sheet's values (formulas are replaced by their last calculated values).
+
+    Raises
+    ------
+    * `KeyError` :
+        If the workbook has no sheet named `sheet_name`.
+    * `IndexError` :
+        If `sheet_name` is a position and the workbook doesn't have that many sheets.
+
+    Examples
+    --------
+    >>> file = msc.input_to_file(inputs["input_file"])
+    >>> df = msc.xlsx_to_dataframe(file, sheet_name="Measurements", nrows=1000)
+    """
+    # openpyxl is only imported when an excel file is actually read
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        if sheet_name is None:
+            sheet = workbook.worksheets[0]
+        elif isinstance(sheet_name, int):
+            sheet = workbook.worksheets[sheet_name]
+        else:
+            sheet = workbook[sheet_name]
+
+        rows = sheet.iter_rows(values_only=True)
+        header_row = list(next(rows, ())) if header else []
+        if nrows is not None:
+            rows = islice(rows, nrows)
+
+        # build the DataFrame column by column instead of from a list of row tuples
+        columns = [[] for _ in header_row]
+        row_count = 0
+        for row in rows:
+            for _ in range(len(columns), len(row)):
+                columns.append([None] * row_count)
+            for column, value in zip(columns, row):
+                # excel stores all numbers as floats, pd.read_excel turns whole numbers back into ints
+                if isinstance(value, float) and value.is_integer():
+                    value = int(value)
+                column.append(value)
+            for column in columns[len(row) :]:
+                column.append(None)
+            row_count += 1
+    finally:
+        workbook.close()
+
+    # read-only sheets can report stale dimensions, which show up as empty rows at the end
+    last_row = max((_last_value_index(column) for column in columns), default=-1) + 1
+
+    if header:
+        # same names pandas gives to columns without a header
+        names = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header_row)]
+        names += [f"Unnamed: {i}" for i in range(len(names), len(columns))]
+        unnamed = [i for i in range(len(names)) if i >= len(header_row) or header_row[i] is None]
+        names = _dedup_names(names, unnamed)
     else:
-        return file_to_dataframe(file_data)
+        names = list(range(len(columns)))
+
+    df = pd.DataFrame({i: column[:last_row] for i, column in enumerate(columns)}, columns=range(len(columns)))
+    df.columns = names
+    return df
+
+
+def _dedup_names(names: List[Any], unnamed: List[int]) -> List[Any]:
+    """
+    Renames repeated column names the way pd.read_excel does: "x", "x" becomes "x", "x.1", skipping names that are
+    already taken. Named columns are renamed before the unnamed ones (at the indices in unnamed).
+    """
+    names = list(names)
+    counts: Dict[Any, int] = {}
+    unnamed_set = set(unnamed)
+    for i in [i for i in range(len(names)) if i not in unnamed_set] + unnamed:
+        name = original = names[i]
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[original] = count + 1
+            name = f"{original}.{count}"
+            count = count + 1 if name in names else counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def _last_value_index(values: List[Any]) -> int:
+    for index in range(len(values) - 1, -1, -1):
+        if values[index] is not None:
+            return index
+    return -1
+
+
+SPREADSHEETML_NAMESPACE = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def _xlsx_sheet_names(file: io.BytesIO) -> List[str]:
+    """Reads the sheet names from xl/workbook.xml without parsing any cell data."""
+    with zipfile.ZipFile(file) as archive:
+        root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    return [sheet.get("name") for sheet in root.iter(f"{SPREADSHEETML_NAMESPACE}sheet")]
+
+
+class Workbook:
+    """
+    >>> Workbook(file: io.BytesIO, file_type: str = ".xlsx")
+
+    A spreadsheet with several sheets, where each sheet is only parsed the first time it is accessed.
+
+    Sheets are accessed by name or position (`workbook["Sheet1"]` or `workbook[0]`) and returned as DataFrames.
+    Parsed sheets are cached, so accessing a sheet again is free. Use `input_to_workbook` to create a Workbook
+    from a base64 encoded input.
+
+    Parameters
+    ----------
+    file : io.BytesIO
+        Decoded spreadsheet file data (e.g., from `input_to_file`).
+    file_type : str, optional
+        The file type (".xlsx", ".xlsm", ".xls", ".xlsb" or ".ods"). Defaults to `".xlsx"`.
+
+    Examples
+    --------
+    >>> workbook = msc.input_to_workbook(inputs["input_file"])
+    >>> print(workbook.sheet_names)
+    ['Inputs', 'Materials', 'Results']
+    >>> materials = workbook["Materials"]
+    """
+
+    def __init__(self, file: io.BytesIO, file_type: str = ".xlsx"):
+        self._file = file
+        self._file_type = _normalize_file_type(file_type)
+        self._sheets = {}
+
+        if self._file_type in (".xlsx", ".xlsm"):
+            self.sheet_names = _xlsx_sheet_names(file)
+        else:
+            with pd.ExcelFile(file, engine=EXCEL_FORMATS.get(self._file_type)) as excel_file:
+                self.sheet_names = list(excel_file.sheet_names)
+
+    def __getitem__(self, sheet: Union[str, int]) -> pd.DataFrame:
+        name = self.sheet_names[sheet] if isinstance(sheet, int) else sheet
+        if name not in self.sheet_names:
+            raise KeyError(f"Worksheet {name} does not exist.")
+
+        if name not in self._sheets:
+            self._file.seek(0)
+            if self._file_type in (".xlsx", ".xlsm"):
+                self._sheets[name] = xlsx_to_dataframe(self._file, sheet_name=name)
+            else:
+                self._sheets[name] = pd.read_excel(
+                    self._file, sheet_name=name, engine=EXCEL_FORMATS.get(self._file_type)
+                )
+        return self._sheets[name]
+
+    def __len__(self) -> int:
+        return len(self.sheet_names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sheet_names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sheet_names
+
+    def __repr__(self) -> str:
+        return f"<Workbook sheets={self.sheet_names}>"
+
+    @property
+    def parsed_sheet_names(self) -> List[str]:
+        """The names of the sheets that have been parsed so far."""
+        return list(self._sheets)
+
+
+def input_to_workbook(input_file: str) -> Workbook:
+    """
+    >>> input_to_workbook(input_file: str) -> Workbook
+
+    Converts a base64 encoded spreadsheet into a `Workbook`. Only the sheet names are read up front,
+    each sheet is parsed into a DataFrame the first time it is accessed.
+
+    Parameters
+    ----------
+    input_file : str
+        The base64 encoded file data (an Excel or OpenDocument spreadsheet).
+
+    Returns
+    -------
+    * `Workbook` :
+        The workbook. `workbook.sheet_names` lists its sheets, `workbook["name"]` returns a sheet as a DataFrame.
+
+    Raises
+    ------
+    * `ValueError` :
+        If the file is not a spreadsheet with sheets (e.g., a CSV file).
+
+    Examples
+    --------
+    >>> workbook = msc.input_to_workbook(inputs["input_file"])
+    >>> for sheet_name in workbook.sheet_names:
+    ...     print(sheet_name, len(workbook[sheet_name]))
+    """
+    file_data, file_extension = input_to_file(input_file, get_file_extension=True, sniff=True)
+    if file_extension not in EXCEL_FORMATS:
+        raise ValueError(f"Only spreadsheets can be opened as a workbook (got a {file_extension} file)")
+
+    return Workbook(file_data, file_extension)
+
+
+_NO_INITIAL = object()
+
+
+def reduce_dataframe_chunks(
+    input_file: str,
+    function: Callable[[Any, pd.DataFrame], Any],
+    initial: Any = _NO_INITIAL,
+    chunksize: int = 100_000,
+    **kwargs,
+) -> Any:
+    """
+    >>> reduce_dataframe_chunks(
+        input_file: str,
+        function: Callable[[Any, pd.DataFrame], Any],
+        initial: Any = <not given>,
+        chunksize: int = 100_000,
+        **kwargs
+    ) -> Any
+
+    Folds a base64 encoded CSV file chunk by chunk, like `functools.reduce`: `result = function(result, chunk)`
+    for every chunk from `iter_dataframe_chunks`.
+
+    Parameters
+    ----------
+    input_file : str
+        The base64 encoded file data (a CSV or other delimited text file).
+    function : Callable[[Any, pd.DataFrame], Any]
+        Combines the result so far with the next chunk and returns the new result.
+    initial : Any, optional
+        The starting result. If not given, the first chunk is used as the starting result (`None` is a starting
+        result like any other value).
+    chunksize : int, optional
+        The number of rows in each chunk. Defaults to `100_000`.
+    **kwargs
+        Extra keyword arguments passed to `pd.read_csv`.
+
+    Returns
+    -------
+    * `Any` :
+        The final result returned by `function` (or `initial` if the file has no rows).
+
+    Raises
+    ------
+    * `ValueError` :
+        If the file is not a text file, or if it has no rows and no `initial` value was given.
+
+    Examples
+    --------
+    **Sum of a column**:
+    >>> total = msc.reduce_dataframe_chunks(inputs["input_file"], lambda total, chunk: total + chunk["A"].sum(), 0)
+
+    **Number of rows above a limit**:
+    >>> count = msc.reduce_dataframe_chunks(
+        inputs["input_file"], lambda count, chunk: count + int((chunk["A"] > 100).sum()), 0
+    )
+    """
+    result = initial
+    for chunk in iter_dataframe_chunks(input_file, chunksize=chunksize, **kwargs):
+        result = chunk if result is _NO_INITIAL else function(result, chunk)
+
+    if result is _NO_INITIAL:
+        raise ValueError("reduce_dataframe_chunks() of an empty file with no initial value")
+    return result
+
+
+# Rows are written to the HTML table in batches of this size
+HTML_BATCH_ROWS = 10_000
+
+
+def _html_cells(values: Union[pd.Series, pd.Index]) -> List[str]:
+    """Formats a column (or index) as escaped HTML cell text, using one vectorized formatter per dtype."""
+    # nullable extension dtypes (Int64, boolean, ...) go through the generic formatter below
+    kind = values.dtype.kind if isinstance(values.dtype, np.dtype) else "O"
+    if kind in "biu":
+        return np.asarray(values).astype(str).tolist()
+
+    missing = np.asarray(values.isna())
+    if kind in "mM":
+        return np.where(missing, "NaT", np.asarray(values.astype(str), dtype=object)).tolist()
+    if kind == "f":
+        # same number of decimals as pandas' display, without its per-column padding
+        cells = np.round(np.asarray(values), pd.get_option("display.precision")).astype(str)
+        return np.where(missing, "NaN", cells).tolist()
+
+    return [
+        _missing_html(value) if is_missing else escape(str(value), quote=False)
+        for value, is_missing in zip(values, missing)
+    ]
+
+
+def _missing_html(value: Any) -> str:
+    """Writes missing values like pandas does: None and nan as "NaN", pd.NA as "<NA>" and pd.NaT as "NaT"."""
+    return "NaN" if value is None or isinstance(value, float) else escape(str(value), quote=False)
+
+
+def _dataframe_to_html(df: pd.DataFrame, index: bool = True) -> str:
+    """
+    Writes df as an HTML table with the same markup as `df.to_html(index=index)`, but formats each column once and
+    writes the rows straight into a single buffer instead of going through pandas' general formatter.
+    """
+    if (
+        isinstance(df.index, pd.MultiIndex)
+        or isinstance(df.columns, pd.MultiIndex)
+        or df.index.name is not None
+        or df.columns.name is not None
+    ):
+        # the extra header rows for these are only supported by pandas' formatter
+        return df.to_html(index=index)
+
+    buffer = io.StringIO()
+    buffer.write('<table border="1" class="dataframe">\n  <thead>\n    <tr style="text-align: right;">\n')
+    if index:
+        buffer.write("      <th></th>\n")
+    for header in _html_cells(df.columns):
+        buffer.write(f"      <th>{header}</th>\n")
+    buffer.write("    </tr>\n  </thead>\n  <tbody>\n")
+
+    # one format string for a whole row: "{}" for the index, then one "{}" per column
+    row_format = "      <td>{}</td>\n" * len(df.columns) + "    </tr>\n"
+    row_format = "    <tr>\n" + ("      <th>{}</th>\n" if index else "") + row_format
+    for start in range(0, len(df), HTML_BATCH_ROWS):
+        batch = df.iloc[start : start + HTML_BATCH_ROWS]
+        buffer.write("".join(row_format.format(*row) for row in zip(*_html_columns(batch, index))))
+
+    buffer.write("  </tbody>\n</table>")
+    return buffer.getvalue()
+
+
+def _html_columns(df: pd.DataFrame, index: bool = True) -> List[List[str]]:
+    """Returns the escaped HTML cell text of df column by column (the index first if index is True)."""
+    columns = [_html_cells(df.iloc[:, i]) for i in range(df.shape[1])]
+    return [_html_cells(df.index)] + columns if index else columns
+
+
+# download_file_type values that are downloaded as an Excel file
+EXCEL_DOWNLOAD_TYPES = {
+    "excel",
+    "xlsx",
+    "xls",
+    "xlsm",
+    "xlsb",
+    "odf",
+    "ods",
+    "odt",
+    "vnd.openxmlformats-officedocument.spreadsheetml.sheet",  # MIME type
+    "vnd.ms-excel",
+}
+
+# download_file_type values that are downloaded as gzip compressed csv
+GZIP_DOWNLOAD_TYPES = {"csv.gz", "gz", "gzip"}
+
+# download format -> MIME type of its data URL (anything not listed here is downloaded as csv)
+DOWNLOAD_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv.gz": "application/gzip",
+    "zip": "application/zip",
+    "parquet": "application/vnd.apache.parquet",
+    "feather": "application/vnd.apache.arrow.file",
+}
+
+# Formats compared by download_file_type="auto" (xlsx is left out: it is much slower to write and never smallest)
+AUTO_DOWNLOAD_FORMATS = ("csv", "csv.gz", "zip", "parquet", "feather")
+
+# Number of rows written in each format to estimate download sizes for download_file_type="auto"
+DOWNLOAD_SAMPLE_ROWS = 5_000
+
+
+# id(df) -> (fingerprint of df, {render key: HTML table or download data URL})
+_render_cache: Dict[int, Tuple[str, Dict[Tuple, str]]] = {}
+
+
+def _dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """Returns a hash of the values, index, labels and dtypes of df (raises TypeError for unhashable values)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    labels = (list(df.columns), df.columns.names, df.index.names, [str(dtype) for dtype in df.dtypes])
+    digest.update(repr(labels).encode())
+    return digest.hexdigest()
+
+
+def _rendered_outputs(df: pd.DataFrame) -> Dict[Tuple, str]:
+    """
+    Returns the renders (HTML tables, download data URLs) already made for df. They are dropped if df changed
+    since, and freed when df is garbage collected.
+    """
+    try:
+        fingerprint = _dataframe_fingerprint(df)
+    except TypeError:
+        # unhashable values (e.g., lists), so changes can't be detected: don't cache
+        return {}
+
+    entry = _render_cache.get(id(df))
+    if entry is not None and entry[0] == fingerprint:
+        return entry[1]
+
+    if entry is None:
+        weakref.finalize(df, _render_cache.pop, id(df), None)
+    rendered = {}
+    _render_cache[id(df)] = (fingerprint, rendered)
+    return rendered
+
+
+def _render_html(df: pd.DataFrame, max_rows: Optional[int], fast_html: bool) -> str:
+    preview = df.iloc[:max_rows] if max_rows is not None and len(df) > max_rows else df
+    html = _dataframe_to_html(preview) if fast_html else preview.to_html()
+    if len(preview) < len(df):
+        html += f"\n<p>Showing {len(preview):,} of {len(df):,} rows</p>"
+    return html
+
+
+class _Base64Writer(io.RawIOBase):
+    """A write-only file object that Base64 encodes the bytes written to it as they arrive."""
+
+    def __init__(self, prefix: str = ""):
+        super().__init__()
+        self._parts = [prefix]
+        self._pending = b""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        # only whole 3 byte groups are encoded, the rest waits for the next write
+        buffered = self._pending + bytes(data) if self._pending else memoryview(data)
+        end = len(buffered) - len(buffered) % 3
+        self._parts.append(binascii.b2a_base64(buffered[:end], newline=False).decode())
+        self._pending = bytes(buffered[end:])
+        return len(data)
+
+    def getvalue(self) -> str:
+        """Returns the prefix followed by the Base64 encoded data (joined once, without further copies)."""
+        return "".join(self._parts + [base64.b64encode(self._pending).decode()])
+
+
+def _download_format(download_file_type: str) -> str:
+    """Maps a download_file_type (e.g., "xls", "gzip") to one of DOWNLOAD_FORMATS or "auto"."""
+    if download_file_type in EXCEL_DOWNLOAD_TYPES:
+        return "xlsx"
+    if download_file_type in GZIP_DOWNLOAD_TYPES:
+        return "csv.gz"
+    if download_file_type == "auto" or download_file_type in DOWNLOAD_FORMATS:
+        return download_file_type
+    return "csv"
+
+
+def _write_csv(df: pd.DataFrame, file: BinaryIO) -> None:
+    try:
+        df.to_csv(file, index=False)
+    except TypeError:
+        # pandas < 1.2 can only write csv to text buffers
+        file.write(df.to_csv(index=False).encode())
+
+
+def _write_download(df: pd.DataFrame, file_format: str, file: BinaryIO) -> None:
+    """Writes df to a binary file object in one of DOWNLOAD_FORMATS."""
+    if file_format == "csv.gz":
+        # level 6 (zlib's default) is almost as small as gzip's default of 9 and much faster;
+        # mtime=0 keeps the output the same for the same data
+        with gzip.GzipFile(fileobj=file, mode="wb", compresslevel=6, mtime=0) as gzip_file:
+            _write_csv(df, gzip_file)
+    elif file_format == "zip":
+        with zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            with zip_file.open("table.csv", "w") as csv_file:
+                _write_csv(df, csv_file)
+    elif file_format in ("xlsx", "parquet", "feather"):
+        # these writers seek while writing, so they write to a buffer first
+        buffer = io.BytesIO()
+        if file_format == "xlsx":
+            df.to_excel(buffer, index=False, engine="openpyxl")
+        elif file_format == "parquet":
+            df.to_parquet(buffer, index=False)
+        else:
+            # feather files can't store an index
+            df.reset_index(drop=True).to_feather(buffer)
+        file.write(buffer.getbuffer())
+    else:
+        _write_csv(df, file)
+
+
+def _smallest_download_format(df: pd.DataFrame) -> str:
+    """Estimates the download size of df in each of AUTO_DOWNLOAD_FORMATS from a sample of its rows."""
+    # evenly spaced rows represent the whole table better than the first rows
+    sample = df.iloc[:: max(1, len(df) // DOWNLOAD_SAMPLE_ROWS)]
+    formats = [file_format for file_format in AUTO_DOWNLOAD_FORMATS if file_format in available_download_formats()]
+
+    sizes = {}
+    for file_format in formats:
+        buffer = io.BytesIO()
+        try:
+            _write_download(sample, file_format, buffer)
+        except (ImportError, ValueError, TypeError):
+            # e.g., pyarrow can't store columns of mixed types
+            continue
+        sizes[file_format] = buffer.tell()
+    return min(sizes, key=sizes.get, default="csv")
+
+
+@lru_cache(maxsize=None)
+def available_download_formats() -> Tuple[str, ...]:
+    """
+    >>> available_download_formats() -> Tuple[str, ...]
+
+    Returns the `download_file_type` formats of `print_dataframe` that can be written with the installed packages
+    (Parquet and Feather need pyarrow).
+
+    Examples
+    --------
+    >>> print(msc.available_download_formats())
+    ('csv', 'xlsx', 'csv.gz', 'zip', 'parquet', 'feather')
+    """
+    has_pyarrow = find_spec("pyarrow") is not None
+    return tuple(
+        file_format for file_format in DOWNLOAD_FORMATS if has_pyarrow or file_format not in ("parquet", "feather")
+    )
+
+
+def _encode_download(df: pd.DataFrame, file_format: str) -> str:
+    """Serializes df and returns it as a Base64 data URL, encoding it as it is written."""
+    writer = _Base64Writer(f"data:{DOWNLOAD_FORMATS[file_format]};base64,")
+    _write_download(df, file_format, writer)
+    return writer.getvalue()
 
 
 def print_dataframe(
@@ -101,6 +981,9 @@ def print_dataframe(
     download_text: str = "Download Table",
     download_file_name: str = "mytable",
     download_file_type: str = "csv",
+    max_rows: Optional[int] = None,
+    fast_html: bool = False,
+    cache: bool = False,
 ) -> Union[str, Tuple[str, str]]:
     """
     >>> print_dataframe(
@@ -108,7 +991,10 @@ def print_dataframe(
         download: bool = False,
         download_text: str = "Download Table",
         download_file_name: str = "mytable",
-        download_file_type: str = "csv"
+        download_file_type: str = "csv",
+        max_rows: Optional[int] = None,
+        fast_html: bool = False,
+        cache: bool = False
     ) -> Union[str, Tuple[str, str]]
 
     Creates an HTML table from a pandas DataFrame and optionally provides a download link for the table.
@@ -124,7 +1010,20 @@ def print_dataframe(
     download_file_name : str, optional
         The name of the file to be downloaded. Defaults to `"myfile"`.
     download_file_type : str, optional
-        The file type of the download file. Can be "xlsx" or "csv". Defaults to `"csv"`.
+        The file type of the download file. Can be "csv", "xlsx", "csv.gz" (gzip compressed csv), "zip" (csv in a
+        ZIP archive), "parquet" or "feather" (both need pyarrow). "auto" estimates the size of each format from a
+        sample of the rows and picks the smallest. Defaults to `"csv"`.
+    max_rows : int, optional
+        If set, the HTML table only shows the first `max_rows` rows, followed by a "Showing N of M rows" note.
+        The download file always contains every row. Defaults to `None` (show every row).
+    fast_html : bool, optional
+        If True, the HTML table is written by a dedicated table writer instead of `df.to_html()`. It is much
+        faster on large tables, but floats aren't padded to the same number of decimals. Defaults to `False`.
+    cache : bool, optional
+        If True, the HTML table and the download file are kept while `df` is alive, and later calls on the same
+        unchanged DataFrame reuse them instead of rendering them again. Checking for changes hashes every value of
+        `df`, which only pays off when the same large table or download is rendered repeatedly (not for `max_rows`
+        previews). Defaults to `False`.
 
     Returns
     -------
@@ -150,41 +1049,42 @@ def print_dataframe(
         "table": table,
         "download_link": download_link
     }
+
+    **With Download Link for the smallest file type**:
+    >>> table, download_link = msc.print_dataframe(df, download=True, download_file_type="auto")
+
+    **Rendered once, shown on several pages**:
+    >>> table, download_link = msc.print_dataframe(df, download=True, cache=True)
     """
+    # renders are reused by later calls on the same (unchanged) DataFrame
+    rendered = _rendered_outputs(df) if cache else {}
+
+    html_key = ("html", max_rows, fast_html)
+    if html_key not in rendered:
+        rendered[html_key] = _render_html(df, max_rows, fast_html)
+    html = rendered[html_key]
+
     if not download:
-        return df.to_html()
+        return html
 
     # -------- Creating Downloadable File --------#
 
-    buf = io.BytesIO()
     download_file_type = download_file_type.lower().strip('.')
+    file_format = _download_format(download_file_type)
 
-    # excel
-    if download_file_type in {
-        "excel",
-        "xlsx",
-        "xls",
-        "xlsm",
-        "xlsb",
-        "odf",
-        "ods",
-        "odt",
-        "vnd.openxmlformats-officedocument.spreadsheetml.sheet",  # MIME type
-        "vnd.ms-excel",
-    }:
-        df.to_excel(buf, index=False, engine="openpyxl")
-        encoded_file = (
-            "data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,"
-            + base64.b64encode(buf.getvalue()).decode()
-        )
-    # csv
-    else:
-        csv_str = df.to_csv(index=False)
-        buf.write(csv_str.encode())
+    if file_format == "auto":
+        if ("auto",) not in rendered:
+            rendered[("auto",)] = _smallest_download_format(df)
+        file_format = rendered[("auto",)]
+
+    download_key = ("download", file_format)
+    if download_key not in rendered:
+        rendered[download_key] = _encode_download(df, file_format)
+    encoded_file = rendered[download_key]
 
-        encoded_file = (
-            "data:text/csv;base64," + base64.b64encode(buf.getvalue()).decode()
-        )
+    # csv and Excel downloads keep the requested extension (e.g., "xls")
+    if download_file_type == "auto" or file_format not in ("csv", "xlsx"):
+        download_file_type = file_format
 
     download_link = f"<a href='{encoded_file}' download='{download_file_name}.{download_file_type}'>{download_text}</a>"
-    return df.to_html(), download_link
+    return html, download_link
@@ -1,12 +1,204 @@
+import json
+import string
+import uuid
+import numpy as np
 import pandas as pd
-from typing import List
+from typing import List, Sequence, Optional
+
+from mecsimcalc.file_utils.spreadsheet_utils import _dataframe_to_html, _html_columns
+
+# Maximum number of bad row indices listed in the error message of table_to_dataframe
+MAX_REPORTED_ROWS = 20
+
+COERCE_OPTIONS = ("numeric", "auto", None)
+
+# Characters stripped from the end of a cell as its unit (e.g., "mm", "kg", "%") when coercing to numbers
+UNIT_CHARACTERS = string.ascii_letters + " %°µ/"
+
+# Characters of a number (stripped from the start of a cell to find its unit)
+NUMBER_CHARACTERS = string.digits + "+-.,eE"
+
+
+# Markup of a paginated table: the first page as HTML, the other rows as JSON and a script that pages through them
+PAGINATED_TABLE = string.Template(
+    """<div id="$id" class="mecsimcalc-table">
+$table
+<div>
+  <button type="button">Previous</button>
+  <span>Page 1 of $pages</span>
+  <button type="button">Next</button>
+</div>
+<script type="application/json">$rows</script>
+<script>
+(function () {
+  var root = document.getElementById("$id");
+  var rows = JSON.parse(root.querySelector("script[type='application/json']").textContent);
+  var tbody = root.querySelector("tbody");
+  var label = root.querySelector("span");
+  var buttons = root.querySelectorAll("button");
+  var firstPage = tbody.innerHTML;
+  var pageSize = $page_size;
+  var pages = $pages;
+  var page = 0;
+
+  function show(newPage) {
+    page = Math.max(0, Math.min(pages - 1, newPage));
+    if (page === 0) {
+      tbody.innerHTML = firstPage;
+    } else {
+      // cells are escaped on the server, like the cells of the first page
+      tbody.innerHTML = rows.slice((page - 1) * pageSize, page * pageSize).map(function (row) {
+        return "<tr>" + row.map(function (value, i) {
+          var tag = $index && i === 0 ? "th" : "td";
+          return "<" + tag + ">" + value + "</" + tag + ">";
+        }).join("") + "</tr>";
+      }).join("");
+    }
+    label.textContent = "Page " + (page + 1) + " of " + pages;
+    buttons[0].disabled = page === 0;
+    buttons[1].disabled = page === pages - 1;
+  }
+
+  buttons[0].onclick = function () { show(page - 1); };
+  buttons[1].onclick = function () { show(page + 1); };
+  show(0);
+})();
+</script>
+</div>"""
+)
+
+
+def _format_floats(df: pd.DataFrame, index: bool) -> pd.DataFrame:
+    """
+    Replaces the float columns of df with the text `df.to_html(index=index)` shows for them. pandas picks the decimals
+    and scientific notation for a float column as a whole, so pages formatted on their own would look different.
+    """
+    float_columns = [i for i, dtype in enumerate(df.dtypes) if dtype.kind == "f"]
+    if not float_columns or len(df) == 0:
+        return df
+
+    try:
+        # what to_html formats each column with, a private pandas API
+        from pandas.io.formats.format import format_array
+    except ImportError:
+        format_array = None
+
+    columns = {i: df.iloc[:, i] for i in range(df.shape[1])}
+    for i in float_columns:
+        if format_array is not None:
+            cells = format_array(np.asarray(df.iloc[:, i]), None, leading_space=index)
+        else:
+            # to_string formats floats like to_html, one line per row
+            cells = df.iloc[:, i].to_frame().to_string(index=False, header=False).split("\n")
+        columns[i] = pd.Series([cell.strip() for cell in cells], index=df.index, dtype=object)
+
+    formatted = pd.DataFrame(columns, index=df.index)
+    formatted.columns = df.columns
+    return formatted
+
+
+def _paginated_html(df: pd.DataFrame, index: bool, page_size: int) -> str:
+    """Renders the first page of df as an HTML table and embeds the other rows as JSON for the inline pager."""
+    df = _format_floats(df, index)
+    rows = [list(row) for row in zip(*_html_columns(df.iloc[page_size:], index))]
+    return PAGINATED_TABLE.substitute(
+        id=f"mecsimcalc-table-{uuid.uuid4().hex}",
+        table=_dataframe_to_html(df.iloc[:page_size], index=index),
+        # "<\/" keeps a "</script>" in the data from ending the script element
+        rows=json.dumps(rows, separators=(",", ":")).replace("</", "<\\/"),
+        page_size=page_size,
+        pages=-(-len(df) // page_size),
+        index="true" if index else "false",
+    )
+
+
+def _validate_row_lengths(column_headers: List[str], rows: Sequence[Sequence]) -> None:
+    """Checks every row length at once and reports all rows that don't match the column headers."""
+    # fast path: a set of the row lengths is built in C
+    if set(map(len, rows)) <= {len(column_headers)}:
+        return
+
+    lengths = np.fromiter(map(len, rows), dtype=np.intp, count=len(rows))
+    bad_rows = np.flatnonzero(lengths != len(column_headers))
+    listed = ", ".join(map(str, bad_rows[:MAX_REPORTED_ROWS]))
+    if len(bad_rows) > MAX_REPORTED_ROWS:
+        listed += f" and {len(bad_rows) - MAX_REPORTED_ROWS} more"
+    raise ValueError(
+        f"Each row must have the same length as the column headers ({len(column_headers)}). "
+        f"Rows with a different length: {listed}"
+    )
+
+
+def _thousands_grouped(number_text: np.ndarray) -> np.ndarray:
+    """Checks that "," only separates groups of 3 digits in the integer part (so "1,5" isn't read as 15)."""
+    integer_part = np.char.partition(np.char.lstrip(number_text, "+- "), ".")[..., 0]
+    length = np.char.str_len(integer_part)
+    commas = np.char.count(integer_part, ",")
+    first_comma = np.char.find(integer_part, ",")
+    return (commas == 0) | (
+        (first_comma >= 1)
+        & (first_comma <= 3)
+        & (np.char.rfind(integer_part, ",") == length - 4)
+        & (commas == (length - commas - 1) // 3)
+    )
+
+
+def _coerce_column(values: np.ndarray, coerce: str) -> Optional[np.ndarray]:
+    """
+    Converts a column of cells (an object array) to numbers in bulk. Returns None if coerce="auto" and not every
+    non-blank cell is a number with the same unit.
+    """
+    try:
+        # fast path: plain numbers, parsed by numpy in C
+        numbers = values.astype(np.float64)
+        number_text = values
+    except (ValueError, TypeError):
+        text = np.where(pd.isna(values), "", values).astype(str)
+        # numpy's float parser skips surrounding whitespace, so units (and blanks) are all that's left to remove
+        number_text = np.char.rstrip(text, UNIT_CHARACTERS)
+        empty = number_text == ""
+        # cells that were only a unit (or text) are empty now too, but aren't blank
+        blank = empty.copy()
+        blank[empty] = np.char.strip(text[empty]) == ""
+
+        has_commas = np.char.find(number_text, ",") >= 0
+        if has_commas.any():
+            grouped = _thousands_grouped(number_text)
+            number_text = np.char.replace(number_text, ",", "")
+        else:
+            grouped = True
+
+        try:
+            numbers = np.where(empty, "nan", number_text).astype(np.float64)
+        except ValueError:
+            numbers = np.asarray(pd.to_numeric(number_text.astype(object), errors="coerce"), dtype=np.float64)
+        numbers = np.where(grouped & (blank | ~empty), numbers, np.nan)
+
+        if coerce == "auto":
+            if (np.isnan(numbers) & ~blank).any():
+                return None
+            units = np.char.strip(np.char.lstrip(text[~blank], NUMBER_CHARACTERS))
+            if len(units) and (units != units[0]).any():
+                return None
+
+    if len(numbers) and np.isfinite(numbers).all() and (numbers == np.round(numbers)).all():
+        try:
+            # parsed again from the text, so integers too large for float64 stay exact
+            return number_text.astype(np.int64)
+        except (ValueError, TypeError, OverflowError):
+            pass
+    return numbers
 
 
 def table_to_dataframe(
-    column_headers: List[str], rows: List[List[str]]
+    column_headers: List[str], rows: List[List[str]], coerce: Optional[str] = None
 ) -> pd.DataFrame:
     """
-    >>> table_to_dataframe(column_headers: List[str], rows: List[List[str]]) -> pd.DataFrame
+    >>> table_to_dataframe(
+        column_headers: List[str],
+        rows: List[List[str]],
+        coerce: Optional[str] = None
+    ) -> pd.DataFrame
 
     Creates a DataFrame from given rows and column headers.
 
@@ -16,16 +208,19 @@ def table_to_dataframe(
         List of column headers.
     rows : List[List[str]]
         List of rows to be converted into a DataFrame. Each row is a list of strings.
-
-    Returns
-    -------
-    * `pd.DataFrame` :
-        A DataFrame constructed from the given rows and column headers.
+    coerce : str, optional
+        Converts columns of strings to numbers (int or float columns). Blank cells become NaN, "," thousands
+        separators are removed and unit suffixes are dropped (e.g., "1,234.5 mm" becomes 1234.5).
+        * `"numeric"` converts every column. Cells that aren't numbers become NaN.
+        * `"auto"` only converts columns where every non-blank cell is a number with the same unit (or none).
+        * `None` keeps the strings. Defaults to `None`.
 
     Raises
     ------
     * `ValueError` :
-        If the length of any row is not equal to the length of column headers.
+        If the length of any row is not equal to the length of column headers. The message lists every such row.
+    * `ValueError` :
+        If `coerce` is not "numeric", "auto" or None.
 
     Examples
     --------
@@ -36,19 +231,53 @@ def table_to_dataframe(
        A  B  C
     0  1  2  3
     1  4  5  6
+
+    >>> rows = [["1,200", "2.5 kg", ""], ["3", "4 kg", "text"]]
+    >>> df = msc.table_to_dataframe(column_headers, rows, coerce="auto")
+    >>> print(df.dtypes)
+    A    int64
+    B    float64
+    C    object
     """
-    for row in rows:
-        if len(row) != len(column_headers):
-            raise ValueError("Each row must have the same length as the column headers")
+    if coerce not in COERCE_OPTIONS:
+        raise ValueError(f"Invalid coerce option: {coerce!r} (must be 'numeric', 'auto' or None)")
+
+    _validate_row_lengths(column_headers, rows)
+
+    if coerce is None:
+        # pandas transposes the rows into columns in C, which is faster than building the columns in python
+        return pd.DataFrame(rows, columns=column_headers)
+
+    values = np.empty((len(rows), len(column_headers)), dtype=object)
+    if rows:
+        values[:] = rows
+
+    columns = {}
+    for i in range(values.shape[1]):
+        numbers = _coerce_column(values[:, i], coerce)
+        columns[i] = values[:, i] if numbers is None else numbers
 
-    return pd.DataFrame(rows, columns=column_headers)
+    # positional keys, so duplicate column headers are handled too
+    df = pd.DataFrame(columns, index=pd.RangeIndex(len(rows)))
+    df.columns = column_headers
+    return df
 
 
 def print_table(
-    column_headers: List[str], rows: List[List[str]], index: bool = True
+    column_headers: List[str],
+    rows: List[List[str]],
+    index: bool = True,
+    coerce: Optional[str] = None,
+    page_size: Optional[int] = None,
 ) -> str:
     """
-    >>> print_table(column_headers: List[str], rows: List[List[str]]) -> str
+    >>> print_table(
+        column_headers: List[str],
+        rows: List[List[str]],
+        index: bool = True,
+        coerce: Optional[str] = None,
+        page_size: Optional[int] = None
+    ) -> str
 
     Creates an HTML table from given rows and column headers.
 
@@ -60,6 +289,18 @@ def print_table(
         A list of rows (each row is a list of strings).
     index : bool, optional
         Whether to use the first column as the DataFrame's index. Defaults to `True`.
+    coerce : str, optional
+        Converts columns of strings to numbers before creating the table ("numeric", "auto" or None).
+        See `table_to_dataframe`. Defaults to `None`.
+    page_size : int, optional
+        If the table has more rows than this, only the first `page_size` rows are rendered as HTML. The other
+        rows are embedded as JSON and shown by "Previous"/"Next" buttons (using a small inline script), so large
+        tables load and display quickly. Defaults to `None` (render every row).
+
+    Raises
+    ------
+    * `ValueError` :
+        If `page_size` is less than 1.
 
     Returns
     -------
@@ -74,7 +315,14 @@ def print_table(
     >>> return {
         "table": table
     }
+
+    **Paginated (50 rows per page)**:
+    >>> table = msc.print_table(column_headers, rows, page_size=50)
     """
+    if page_size is not None and page_size < 1:
+        raise ValueError(f"Invalid page_size: {page_size} (must be at least 1)")
 
-    df = table_to_dataframe(column_headers, rows)
+    df = table_to_dataframe(column_headers, rows, coerce)
+    if page_size is not None and len(df) > page_size:
+        return _paginated_html(df, index, page_size)
     return df.to_html(index=index, border=1, escape=True)
@@ -47,5 +47,6 @@ setup(
     ],
     extras_require={
         "dev": ["pytest>=7.0", "twine >= 4.0.2"],
+        "pyarrow": ["pyarrow"],
     },
 )